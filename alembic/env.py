@@ -13,6 +13,11 @@ from backend.app.models.payments import *
 from backend.app.models.images import *
 from backend.app.models.receipt import *
 from backend.app.models.hostels import *
+from backend.app.models.hostel_card import *
+from backend.app.models.hostel_stats import *
+from backend.app.models.idempotency import *
+from backend.app.models.reconciliation import *
+from backend.app.models.revenue import *
 
 settings = get_settings()
 
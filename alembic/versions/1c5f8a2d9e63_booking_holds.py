@@ -0,0 +1,31 @@
+"""booking holds
+
+Revision ID: 1c5f8a2d9e63
+Revises: 0a3e6c9b7d51
+Create Date: 2026-10-18 17:03:38.842915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c5f8a2d9e63'
+down_revision: Union[str, None] = '0a3e6c9b7d51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing bookings keep no expiry, only new bookings get a hold
+    op.add_column('bookings', sa.Column('expires_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_bookings_status_expires_at', 'bookings', ['status', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_status_expires_at', table_name='bookings')
+    op.drop_column('bookings', 'expires_at')
@@ -0,0 +1,47 @@
+"""payment reconciliation
+
+Revision ID: 2e8b4f6a1c07
+Revises: 1c5f8a2d9e63
+Create Date: 2026-10-18 18:21:47.305128
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8b4f6a1c07'
+down_revision: Union[str, None] = '1c5f8a2d9e63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+reconciliation_issue = postgresql.ENUM('MISSING_STRIPE_PAYMENT', 'AMOUNT_MISMATCH', 'BOOKING_MISMATCH',
+                                       name='reconciliationissue', create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reconciliation_checkpoints',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_payment_id', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_stripe_payment_id', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    reconciliation_issue.create(op.get_bind(), checkfirst=True)
+    op.add_column('payments', sa.Column('reconciliation_issue', reconciliation_issue, nullable=True))
+    op.add_column('payments', sa.Column('reconciled_at', sa.DateTime(timezone=True), nullable=True))
+    # Payments are matched to Stripe payments by transaction id
+    op.create_index(op.f('ix_stripe_payments_transaction_id'), 'stripe_payments', ['transaction_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stripe_payments_transaction_id'), table_name='stripe_payments')
+    op.drop_column('payments', 'reconciled_at')
+    op.drop_column('payments', 'reconciliation_issue')
+    reconciliation_issue.drop(op.get_bind(), checkfirst=True)
+    op.drop_table('reconciliation_checkpoints')
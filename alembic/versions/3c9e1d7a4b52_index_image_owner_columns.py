@@ -0,0 +1,30 @@
+"""index image owner columns
+
+Revision ID: 3c9e1d7a4b52
+Revises: 1bf12e6464a7
+Create Date: 2026-10-18 09:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1d7a4b52'
+down_revision: Union[str, None] = '1bf12e6464a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_images_hostel_id'), 'images', ['hostel_id'], unique=False)
+    op.create_index(op.f('ix_images_room_id'), 'images', ['room_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_images_room_id'), table_name='images')
+    op.drop_index(op.f('ix_images_hostel_id'), table_name='images')
@@ -0,0 +1,48 @@
+"""daily revenue rollup
+
+Revision ID: 3f9c5a7b2d18
+Revises: 2e8b4f6a1c07
+Create Date: 2026-10-18 19:02:11.640392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c5a7b2d18'
+down_revision: Union[str, None] = '2e8b4f6a1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_revenue',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hostel_id', sa.Integer(), nullable=False),
+    sa.Column('payment_method', sa.String(length=100), nullable=False),
+    sa.Column('amount', sa.Float(), server_default='0', nullable=False),
+    sa.Column('payment_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['hostel_id'], ['hostels.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'hostel_id', 'payment_method')
+    )
+    op.create_table('revenue_rollup_checkpoints',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('processed_until', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Payments of a hostel are found through its bookings, and changed payments by their last write
+    op.create_index(op.f('ix_payments_booking_id'), 'payments', ['booking_id'], unique=False)
+    op.create_index('ix_payments_changed_at', 'payments', [sa.text('coalesce(updated_at, created_at)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_changed_at', table_name='payments')
+    op.drop_index(op.f('ix_payments_booking_id'), table_name='payments')
+    op.drop_table('revenue_rollup_checkpoints')
+    op.drop_table('daily_revenue')
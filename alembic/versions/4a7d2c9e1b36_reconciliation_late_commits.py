@@ -0,0 +1,38 @@
+"""reconciliation late commits
+
+Revision ID: 4a7d2c9e1b36
+Revises: 3f9c5a7b2d18
+Create Date: 2026-10-18 20:14:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7d2c9e1b36'
+down_revision: Union[str, None] = '3f9c5a7b2d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Settled from zero, so the first run goes through the rows already passed once more
+    op.add_column('reconciliation_checkpoints', sa.Column('last_snapshot_xmax', sa.BigInteger(), nullable=True))
+    op.add_column('reconciliation_checkpoints',
+                  sa.Column('settled_payment_id', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('reconciliation_checkpoints',
+                  sa.Column('settled_stripe_payment_id', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_payments_unreconciled', 'payments', ['id'], unique=False,
+                    postgresql_where=sa.text('reconciled_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payments_unreconciled', table_name='payments', postgresql_where=sa.text('reconciled_at IS NULL'))
+    op.drop_column('reconciliation_checkpoints', 'settled_stripe_payment_id')
+    op.drop_column('reconciliation_checkpoints', 'settled_payment_id')
+    op.drop_column('reconciliation_checkpoints', 'last_snapshot_xmax')
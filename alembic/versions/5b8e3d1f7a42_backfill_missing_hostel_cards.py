@@ -0,0 +1,46 @@
+"""backfill missing hostel cards
+
+Revision ID: 5b8e3d1f7a42
+Revises: 4a7d2c9e1b36
+Create Date: 2026-10-18 20:41:09.273615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e3d1f7a42'
+down_revision: Union[str, None] = '4a7d2c9e1b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Hostels saved while their card was still built in a later transaction may have none,
+    # same query as HostelCardRepository.refresh_hostel_cards
+    op.execute("""
+        INSERT INTO hostel_cards (hostel_id, name, description, location, owner_id, average_price, available_rooms,
+                                  amenities, rules, images, room_count, min_room_price, created_at, updated_at,
+                                  refreshed_at)
+        SELECT h.id, h.name, h.description, h.location, h.user_id, h.average_price, h.available_rooms,
+               h.amenities, h.rules,
+               COALESCE((SELECT jsonb_agg(jsonb_build_object('bucket_name', i.bucket_name,
+                                                             'object_name', i.object_name,
+                                                             'version_id', i.version_id) ORDER BY i.id)
+                         FROM images i WHERE i.hostel_id = h.id), '[]'::jsonb),
+               (SELECT count(r.id) FROM rooms r WHERE r.hostel_id = h.id),
+               (SELECT min(r.price_per_semester) FROM rooms r WHERE r.hostel_id = h.id),
+               h.created_at, h.updated_at, now()
+        FROM hostels h
+        WHERE NOT EXISTS (SELECT 1 FROM hostel_cards c WHERE c.hostel_id = h.id)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The cards are kept, they are valid at the previous revision too
+    pass
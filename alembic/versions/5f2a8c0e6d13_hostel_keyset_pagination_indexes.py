@@ -0,0 +1,32 @@
+"""hostel keyset pagination indexes
+
+Revision ID: 5f2a8c0e6d13
+Revises: 3c9e1d7a4b52
+Create Date: 2026-10-18 10:04:17.581932
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2a8c0e6d13'
+down_revision: Union[str, None] = '3c9e1d7a4b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows without created_at would never show up on a keyset page
+    op.execute("UPDATE hostels SET created_at = now() WHERE created_at IS NULL")
+    op.create_index('ix_hostels_created_at_id', 'hostels', ['created_at', 'id'], unique=False)
+    op.create_index('ix_hostels_user_id_created_at_id', 'hostels', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hostels_user_id_created_at_id', table_name='hostels')
+    op.drop_index('ix_hostels_created_at_id', table_name='hostels')
@@ -0,0 +1,33 @@
+"""hostel trigram indexes
+
+Revision ID: 8d4b6f2e1a90
+Revises: 5f2a8c0e6d13
+Create Date: 2026-10-18 10:47:52.310264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4b6f2e1a90'
+down_revision: Union[str, None] = '5f2a8c0e6d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_hostels_name_trgm', 'hostels', ['name'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_hostels_location_trgm', 'hostels', ['location'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'location': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hostels_location_trgm', table_name='hostels', postgresql_using='gin')
+    op.drop_index('ix_hostels_name_trgm', table_name='hostels', postgresql_using='gin')
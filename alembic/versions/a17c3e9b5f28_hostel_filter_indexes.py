@@ -0,0 +1,34 @@
+"""hostel filter indexes
+
+Revision ID: a17c3e9b5f28
+Revises: 8d4b6f2e1a90
+Create Date: 2026-10-18 11:36:05.772419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a17c3e9b5f28'
+down_revision: Union[str, None] = '8d4b6f2e1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_hostels_location_average_price', 'hostels', ['location', 'average_price'], unique=False)
+    op.create_index('ix_hostels_vacant_average_price', 'hostels', ['average_price'], unique=False,
+                    postgresql_where=sa.text('available_rooms > 0'))
+    op.create_index('ix_hostels_amenities_trgm', 'hostels', ['amenities'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'amenities': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hostels_amenities_trgm', table_name='hostels', postgresql_using='gin')
+    op.drop_index('ix_hostels_vacant_average_price', table_name='hostels')
+    op.drop_index('ix_hostels_location_average_price', table_name='hostels')
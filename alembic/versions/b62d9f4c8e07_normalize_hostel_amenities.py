@@ -0,0 +1,47 @@
+"""normalize hostel amenities
+
+Revision ID: b62d9f4c8e07
+Revises: a17c3e9b5f28
+Create Date: 2026-10-18 12:21:48.019635
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62d9f4c8e07'
+down_revision: Union[str, None] = 'a17c3e9b5f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hostels', sa.Column('amenity_tags', postgresql.ARRAY(sa.String(length=100)),
+                                       server_default='{}', nullable=False))
+
+    # Backfill from the comma separated text, same rules as models.hostels.normalize_amenities
+    op.execute("""
+        UPDATE hostels
+        SET amenity_tags = ARRAY(
+            SELECT DISTINCT lower(trim(tag))
+            FROM unnest(string_to_array(amenities, ',')) AS tag
+            WHERE trim(tag) <> ''
+            ORDER BY 1
+        )
+        WHERE amenities IS NOT NULL
+    """)
+
+    op.create_index('ix_hostels_amenity_tags', 'hostels', ['amenity_tags'], unique=False, postgresql_using='gin')
+    op.drop_index('ix_hostels_amenities_trgm', table_name='hostels', postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_hostels_amenities_trgm', 'hostels', ['amenities'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'amenities': 'gin_trgm_ops'})
+    op.drop_index('ix_hostels_amenity_tags', table_name='hostels', postgresql_using='gin')
+    op.drop_column('hostels', 'amenity_tags')
@@ -0,0 +1,41 @@
+"""store parsed hostel rules
+
+Revision ID: c3f81a6d2b94
+Revises: b62d9f4c8e07
+Create Date: 2026-10-18 13:02:33.487120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f81a6d2b94'
+down_revision: Union[str, None] = 'b62d9f4c8e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hostels', sa.Column('rules', postgresql.JSONB(astext_type=sa.Text()),
+                                       server_default='[]', nullable=False))
+
+    # Backfill with the same rules as models.hostels.parse_rules: split on commas,
+    # trim, drop empty rules and convert each one to sentence case.
+    op.execute("""
+        UPDATE hostels
+        SET rules = COALESCE((
+            SELECT jsonb_agg(upper(left(trim(rule), 1)) || lower(substr(trim(rule), 2)) ORDER BY position)
+            FROM unnest(string_to_array(rules_and_regulations, ',')) WITH ORDINALITY AS r(rule, position)
+            WHERE trim(rule) <> ''
+        ), '[]'::jsonb)
+        WHERE rules_and_regulations IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('hostels', 'rules')
@@ -0,0 +1,65 @@
+"""create hostel cards
+
+Revision ID: d48e2b7f9c15
+Revises: c3f81a6d2b94
+Create Date: 2026-10-18 14:10:26.951873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd48e2b7f9c15'
+down_revision: Union[str, None] = 'c3f81a6d2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('hostel_cards',
+    sa.Column('hostel_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('average_price', sa.Integer(), nullable=False),
+    sa.Column('available_rooms', sa.Integer(), nullable=False),
+    sa.Column('amenities', sa.Text(), nullable=True),
+    sa.Column('rules', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.Column('images', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.Column('room_count', sa.Integer(), nullable=False),
+    sa.Column('min_room_price', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['hostel_id'], ['hostels.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hostel_id')
+    )
+    op.create_index('ix_hostel_cards_created_at_hostel_id', 'hostel_cards', ['created_at', 'hostel_id'], unique=False)
+
+    # Build a card for every existing hostel, same query as HostelCardRepository.refresh_hostel_cards
+    op.execute("""
+        INSERT INTO hostel_cards (hostel_id, name, description, location, owner_id, average_price, available_rooms,
+                                  amenities, rules, images, room_count, min_room_price, created_at, updated_at,
+                                  refreshed_at)
+        SELECT h.id, h.name, h.description, h.location, h.user_id, h.average_price, h.available_rooms,
+               h.amenities, h.rules,
+               COALESCE((SELECT jsonb_agg(jsonb_build_object('bucket_name', i.bucket_name,
+                                                             'object_name', i.object_name,
+                                                             'version_id', i.version_id) ORDER BY i.id)
+                         FROM images i WHERE i.hostel_id = h.id), '[]'::jsonb),
+               (SELECT count(r.id) FROM rooms r WHERE r.hostel_id = h.id),
+               (SELECT min(r.price_per_semester) FROM rooms r WHERE r.hostel_id = h.id),
+               h.created_at, h.updated_at, now()
+        FROM hostels h
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hostel_cards_created_at_hostel_id', table_name='hostel_cards')
+    op.drop_table('hostel_cards')
@@ -0,0 +1,61 @@
+"""create hostel stats
+
+Revision ID: e5a9c4d1f372
+Revises: d48e2b7f9c15
+Create Date: 2026-10-18 15:02:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c4d1f372'
+down_revision: Union[str, None] = 'd48e2b7f9c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('hostel_stats',
+    sa.Column('hostel_id', sa.Integer(), nullable=False),
+    sa.Column('pending_bookings', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('confirmed_bookings', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cancelled_bookings', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('booking_revenue', sa.Float(), server_default='0', nullable=False),
+    sa.Column('amount_paid', sa.Float(), server_default='0', nullable=False),
+    sa.Column('room_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('capacity', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('occupancy', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['hostel_id'], ['hostels.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hostel_id')
+    )
+
+    # Seed the running totals from the existing bookings, payments and rooms
+    op.execute("""
+        INSERT INTO hostel_stats (hostel_id, pending_bookings, confirmed_bookings, cancelled_bookings,
+                                  booking_revenue, amount_paid, room_count, capacity, occupancy, updated_at)
+        SELECT h.id,
+               (SELECT count(*) FROM bookings b WHERE b.hostel_id = h.id AND b.status = 'PENDING'),
+               (SELECT count(*) FROM bookings b WHERE b.hostel_id = h.id AND b.status = 'CONFIRMED'),
+               (SELECT count(*) FROM bookings b WHERE b.hostel_id = h.id AND b.status = 'CANCELLED'),
+               (SELECT COALESCE(sum(r.price_per_semester), 0)
+                FROM bookings b JOIN rooms r ON r.id = b.room_id WHERE b.hostel_id = h.id),
+               (SELECT COALESCE(sum(p.amount), 0)
+                FROM payments p JOIN bookings b ON b.id = p.booking_id
+                WHERE b.hostel_id = h.id AND p.payment_status = 'COMPLETED'),
+               (SELECT count(*) FROM rooms r WHERE r.hostel_id = h.id),
+               (SELECT COALESCE(sum(r.capacity), 0) FROM rooms r WHERE r.hostel_id = h.id),
+               (SELECT COALESCE(sum(r.occupancy), 0) FROM rooms r WHERE r.hostel_id = h.id),
+               now()
+        FROM hostels h
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('hostel_stats')
@@ -0,0 +1,29 @@
+"""booking feed index
+
+Revision ID: f1b7d3a8e264
+Revises: e5a9c4d1f372
+Create Date: 2026-10-18 15:41:09.624517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3a8e264'
+down_revision: Union[str, None] = 'e5a9c4d1f372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_hostel_id_status_created_at', 'bookings', ['hostel_id', 'status', 'created_at'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_hostel_id_status_created_at', table_name='bookings')
@@ -0,0 +1,30 @@
+"""
+Reconciles the payments table against Stripe payments received by webhook.
+
+Each run picks up where the previous one stopped; run it from cron or by hand.
+
+Usage:
+    python -m backend.app.commands.reconcile_payments [--batch-size 10000]
+"""
+import argparse
+import time
+
+from backend.app.services.payments import reconcile_payments, RECONCILIATION_BATCH_SIZE
+
+
+def run(batch_size: int):
+    started = time.perf_counter()
+    counts = reconcile_payments(batch_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"Reconciled {sum(counts.values())} payments in {elapsed:.2f}s")
+    for (payment_status, issue), count in sorted(counts.items(), key=lambda item: -item[1]):
+        issue_name = issue.value if issue is not None else "matched"
+        print(f"{count:>8}  {payment_status.value:<14} {issue_name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-size", type=int, default=RECONCILIATION_BATCH_SIZE,
+                        help=f"Ids reconciled per transaction (default: {RECONCILIATION_BATCH_SIZE})")
+    run(parser.parse_args().batch_size)
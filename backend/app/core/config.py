@@ -39,6 +39,48 @@ class Settings(BaseSettings):
     MINIO_IMAGE_BUCKET_NAME: str = Field(..., env="MINIO_IMAGE_BUCKET_NAME")
     MINIO_PDF_BUCKET_NAME: str = Field(..., env="MINIO_PDF_BUCKET_NAME")
     MINIO_PUBLIC_ENDPOINT: str = Field(..., env="MINIO_PUBLIC_ENDPOINT")
+    MINIO_REGION: str = Field("us-east-1", env="MINIO_REGION")
+    PRESIGNED_URL_CACHE_SIZE: int = Field(10000, env="PRESIGNED_URL_CACHE_SIZE")
+    PRESIGNED_URL_REFRESH_MARGIN: int = Field(300, env="PRESIGNED_URL_REFRESH_MARGIN")
+
+    # Hostel detail response cache, keep the TTL well below PRESIGNED_URL_REFRESH_MARGIN
+    HOSTEL_DETAIL_CACHE_SIZE: int = Field(2048, env="HOSTEL_DETAIL_CACHE_SIZE")
+    HOSTEL_DETAIL_CACHE_TTL: int = Field(120, env="HOSTEL_DETAIL_CACHE_TTL")
+
+    # Responses, FAST_JSON_RESPONSES needs orjson installed
+    FAST_JSON_RESPONSES: bool = Field(False, env="FAST_JSON_RESPONSES")
+    GZIP_MINIMUM_SIZE: int = Field(1000, env="GZIP_MINIMUM_SIZE")
+    GZIP_COMPRESS_LEVEL: int = Field(6, env="GZIP_COMPRESS_LEVEL")
+
+    # Idempotency-Key replay window and expired key cleanup, in seconds. A key whose request
+    # is not done after IDEMPOTENCY_LEASE (its worker died) may be claimed by a retry
+    IDEMPOTENCY_KEY_TTL: int = Field(86400, env="IDEMPOTENCY_KEY_TTL")
+    IDEMPOTENCY_LEASE: int = Field(60, env="IDEMPOTENCY_LEASE")
+    IDEMPOTENCY_SWEEP_INTERVAL: int = Field(300, env="IDEMPOTENCY_SWEEP_INTERVAL")
+
+    # Per-room booking admission queue, BOOKING_ADMISSION_MAX_WAIT in seconds
+    BOOKING_ADMISSION_QUEUE_DEPTH: int = Field(32, env="BOOKING_ADMISSION_QUEUE_DEPTH")
+    BOOKING_ADMISSION_MAX_WAIT: float = Field(5.0, env="BOOKING_ADMISSION_MAX_WAIT")
+
+    # How long an unpaid booking holds its room, and how often expired holds are released, in seconds
+    BOOKING_HOLD_TTL: int = Field(172800, env="BOOKING_HOLD_TTL")
+    BOOKING_HOLD_SWEEP_INTERVAL: int = Field(60, env="BOOKING_HOLD_SWEEP_INTERVAL")
+
+    # How often the daily revenue rollup picks up new payments, in seconds
+    REVENUE_ROLLUP_INTERVAL: int = Field(300, env="REVENUE_ROLLUP_INTERVAL")
+
+    # Receipt PDFs, RECEIPT_RENDERER is "xhtml2pdf" (in-process) or "pdfkit" (wkhtmltopdf per receipt)
+    RECEIPT_RENDERER: str = Field("xhtml2pdf", env="RECEIPT_RENDERER")
+    RECEIPT_RENDER_WORKERS: int = Field(2, env="RECEIPT_RENDER_WORKERS")
+    RECEIPT_RENDER_MAX_PENDING: int = Field(32, env="RECEIPT_RENDER_MAX_PENDING")
+    RECEIPT_RENDER_MAX_TASKS_PER_CHILD: int = Field(500, env="RECEIPT_RENDER_MAX_TASKS_PER_CHILD")
+
+    # Stripe webhooks, events are written in batches of up to STRIPE_WEBHOOK_BATCH_SIZE
+    # collected for at most STRIPE_WEBHOOK_BATCH_WAIT seconds
+    STRIPE_WEBHOOK_SECRET: str = Field("", env="STRIPE_WEBHOOK_SECRET")
+    STRIPE_WEBHOOK_TOLERANCE: int = Field(300, env="STRIPE_WEBHOOK_TOLERANCE")
+    STRIPE_WEBHOOK_BATCH_SIZE: int = Field(500, env="STRIPE_WEBHOOK_BATCH_SIZE")
+    STRIPE_WEBHOOK_BATCH_WAIT: float = Field(0.05, env="STRIPE_WEBHOOK_BATCH_WAIT")
 
     # Security
     ALLOWED_HOSTS: str = Field(..., env="ALLOWED_HOSTS")
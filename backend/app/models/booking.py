@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, Enum, Index
 from sqlalchemy.orm import relationship
 from backend.app.database.database import Base
 import enum
@@ -34,8 +34,18 @@ class Booking(Base):
     created_at = Column(DateTime, server_default=func.now(), index=True)
     updated_at = Column(DateTime, onupdate=func.now())
 
+    # A pending booking holds its place in the room until then, unless it is paid
+    expires_at = Column(DateTime, nullable=True)
+
     # Relationships
     hostel = relationship("Hostel", back_populates="bookings")
     room = relationship("Room", back_populates="bookings")
     payments = relationship("Payment", back_populates="booking")
-    stripe_payments = relationship("StripePayment", back_populates="booking")
\ No newline at end of file
+    stripe_payments = relationship("StripePayment", back_populates="booking")
+
+    __table_args__ = (
+        # Custodian bookings feed: a hostel's bookings by status, newest first
+        Index("ix_bookings_hostel_id_status_created_at", "hostel_id", "status", "created_at"),
+        # Expired hold sweep
+        Index("ix_bookings_status_expires_at", "status", "expires_at"),
+    )
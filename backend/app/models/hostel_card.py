@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from backend.app.database.database import Base
+
+
+class HostelCard(Base):
+    """
+    Denormalized read model holding everything a hostel listing card shows.
+
+    One row per hostel, rebuilt by HostelCardRepository whenever the hostel,
+    its rooms or its images change, so listing endpoints read a single row
+    per hostel instead of joining hostels, rooms and images on every request.
+    """
+    __tablename__ = "hostel_cards"
+
+    hostel_id = Column(Integer, ForeignKey("hostels.id", ondelete="CASCADE"), primary_key=True)
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    location = Column(String(255), nullable=False)
+    owner_id = Column(Integer, nullable=False)
+    average_price = Column(Integer, nullable=False)
+    available_rooms = Column(Integer, nullable=False, default=0)
+    amenities = Column(Text, nullable=True)
+    rules = Column(JSONB, nullable=False, server_default="[]")
+
+    # [{"bucket_name": ..., "object_name": ..., "version_id": ...}] in upload order
+    images = Column(JSONB, nullable=False, server_default="[]")
+
+    # Room aggregates
+    room_count = Column(Integer, nullable=False, default=0)
+    min_room_price = Column(Float, nullable=True)
+
+    created_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_hostel_cards_created_at_hostel_id", "created_at", "hostel_id"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, func
+
+from backend.app.database.database import Base
+
+
+class HostelStats(Base):
+    """
+    Running per-hostel totals behind the owner dashboard.
+
+    One row per hostel, adjusted by HostelStatsRepository in the same
+    transaction as each booking, payment and room write, so the dashboard
+    reads a single row per hostel instead of aggregating raw bookings.
+    """
+    __tablename__ = "hostel_stats"
+
+    hostel_id = Column(Integer, ForeignKey("hostels.id", ondelete="CASCADE"), primary_key=True)
+
+    # Bookings by BookingStatus
+    pending_bookings = Column(Integer, nullable=False, default=0, server_default="0")
+    confirmed_bookings = Column(Integer, nullable=False, default=0, server_default="0")
+    cancelled_bookings = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Semester price of the booked room summed over every booking
+    booking_revenue = Column(Float, nullable=False, default=0, server_default="0")
+    # Amount of completed payments
+    amount_paid = Column(Float, nullable=False, default=0, server_default="0")
+
+    # Room aggregates
+    room_count = Column(Integer, nullable=False, default=0, server_default="0")
+    capacity = Column(Integer, nullable=False, default=0, server_default="0")
+    occupancy = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -3,11 +3,30 @@ from sqlalchemy import (
     Index, Computed, Float,Enum
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import TSVECTOR, ARRAY, JSONB
+from typing import Iterable, List, Optional
 
 import enum
 from backend.app.database.database import Base
 
+
+def normalize_amenities(amenities: Iterable[str]) -> List[str]:
+    """
+    Turns raw amenity names into the sorted, de-duplicated, lowercase tags stored in `Hostel.amenity_tags`.
+    """
+    return sorted({amenity.strip().lower() for amenity in amenities if amenity and amenity.strip()})
+
+
+def parse_rules(rules_and_regulations: Optional[str]) -> List[str]:
+    """
+    Splits the comma separated rules into a list of sentence case rules, stored in `Hostel.rules`.
+    """
+    if not rules_and_regulations:
+        return []
+    # Strip each rule of excess spaces and convert it to sentence case.
+    return [rule.strip().capitalize() for rule in rules_and_regulations.split(',') if rule.strip()]
+
+
 class Hostel(Base):
     """
     Represents a hostel in the system.
@@ -22,7 +41,11 @@ class Hostel(Base):
     average_price = Column(Integer, nullable=False)
     available_rooms = Column(Integer, nullable=False, default=0)
     rules_and_regulations = Column(Text, nullable=True)
+    # `rules_and_regulations` parsed once on write, so serializing a hostel needs no string processing
+    rules = Column(JSONB, nullable=False, default=list, server_default="[]")
     amenities = Column(Text, nullable=True)
+    # Normalized copy of `amenities`, kept in sync on write and GIN indexed for containment queries
+    amenity_tags = Column(ARRAY(String(100)), nullable=False, default=list, server_default="{}")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
@@ -38,17 +61,24 @@ class Hostel(Base):
     rooms = relationship("Room", back_populates="hostel", cascade="all, delete-orphan")
     bookings = relationship("Booking", back_populates="hostel", cascade="all, delete-orphan")
 
-    # Create GIN index for the search_vector column
+    # Create GIN index for the search_vector column and keyset pagination indexes
     __table_args__ = (
         Index("fts_idx", "search_vector", postgresql_using="gin"),
+        Index("ix_hostels_created_at_id", "created_at", "id"),
+        Index("ix_hostels_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Trigram indexes for typeahead suggestions (requires the pg_trgm extension)
+        Index("ix_hostels_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_hostels_location_trgm", "location", postgresql_using="gin",
+              postgresql_ops={"location": "gin_trgm_ops"}),
+        # Indexes backing the /hostels/filter facets
+        Index("ix_hostels_location_average_price", "location", "average_price"),
+        Index("ix_hostels_vacant_average_price", "average_price", postgresql_where=available_rooms > 0),
+        Index("ix_hostels_amenity_tags", "amenity_tags", postgresql_using="gin"),
     )
 
     def get_rules(self):
-        if self.rules_and_regulations:
-            # Split the string by commas, strip each rule of excess spaces,
-            # and convert each rule to sentence case.
-            return [rule.strip().capitalize() for rule in self.rules_and_regulations.split(',')]
-        return []
+        # Parsed by parse_rules when the hostel is written
+        return self.rules or []
 
 
 class RoomType(enum.Enum):
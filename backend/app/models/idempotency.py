@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from backend.app.database.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Outcome of a POST made with an Idempotency-Key header.
+
+    The row is claimed before the request is handled and completed with its
+    response afterwards; retries with the same key replay that response until
+    `expires_at`, after which the sweeper deletes the row. A row left without a
+    response for longer than the lease (IDEMPOTENCY_LEASE) may be claimed again.
+    """
+    __tablename__ = "idempotency_keys"
+
+    # Endpoint the key was used on, e.g. "booking.create"
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+
+    # SHA-256 of the request body, a key may not be reused for a different request
+    request_hash = Column(String(64), nullable=False)
+
+    # Empty while the first request is still being handled
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(JSONB, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -15,8 +15,8 @@ class ImageMetaData(Base):
     version_id = Column(String(50), nullable=True)
     etag = Column(String(50), nullable=True)
 
-    hostel_id = Column(Integer, ForeignKey("hostels.id"), nullable=True)
-    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=True)
+    hostel_id = Column(Integer, ForeignKey("hostels.id"), nullable=True, index=True)
+    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=True, index=True)
 
     created_at = Column(DateTime, server_default=func.now())
 
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Integer, String, DateTime,Enum, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime,Enum, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -12,22 +12,38 @@ class PaymentStatus(enum.Enum):
     NOT_RECEIVED = "not_received"
     FAILED = "failed"
 
+class ReconciliationIssue(enum.Enum):
+    MISSING_STRIPE_PAYMENT = "missing_stripe_payment"
+    AMOUNT_MISMATCH = "amount_mismatch"
+    BOOKING_MISMATCH = "booking_mismatch"
+
 class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, index=True)
     amount = Column(Float, nullable=False)
     payment_status = Column(Enum(PaymentStatus), nullable=False, default=PaymentStatus.PENDING)
     transaction_id = Column(String(100), nullable=False, unique=True, index=True)
     payment_method = Column(String(100), nullable=False)
 
+    # Set by the reconciliation job, the issue is empty when the payment matches its Stripe payment
+    reconciliation_issue = Column(Enum(ReconciliationIssue), nullable=True)
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships if needed
     booking = relationship("Booking", back_populates="payments")
 
+    __table_args__ = (
+        # Lets the revenue rollup find the payments written or changed since its last run
+        Index("ix_payments_changed_at", func.coalesce(updated_at, created_at)),
+        # Payments the reconciliation job has not been through yet, e.g. committed after it passed their id
+        Index("ix_payments_unreconciled", "id", postgresql_where=reconciled_at.is_(None)),
+    )
+
 class StripePaymentStatus(enum.Enum):
     PENDING = "pending"
     COMPLETED = "completed"
@@ -42,7 +58,7 @@ class StripePayment(Base):
     amount_received = Column(Float, nullable=False)
     currency = Column(String(3), nullable=False)  # e.g., 'usd'
     stripe_payment_status = Column(Enum(StripePaymentStatus), nullable=False, default=StripePaymentStatus.PENDING)
-    transaction_id = Column(String(100), nullable=False)  # Stripe charge ID or transaction ID
+    transaction_id = Column(String(100), nullable=False, index=True)  # Stripe charge ID or transaction ID
     payment_method = Column(String(100), nullable=False)
     customer_id = Column(String(100), nullable=True)  # Stripe Customer ID (if applicable)
     customer_email = Column(String(100), nullable=True)  # Customer email
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, func
+
+from backend.app.database.database import Base
+
+
+class ReconciliationCheckpoint(Base):
+    """
+    How far a reconciliation job has got, so each run only processes new rows.
+
+    A run reconciles every payment above `last_payment_id`, and every payment matched
+    by a Stripe payment above `last_stripe_payment_id`, then moves both forward.
+
+    Ids are taken when a row is inserted but become visible when its transaction
+    commits, so a row can appear below `last_*` after the job passed it. The rows up
+    to `last_*` are only known to be complete once every transaction that was running
+    when they were passed has ended, i.e. the oldest running transaction id reaches
+    `last_snapshot_xmax`. The next run then reconciles that window once more, and the
+    ids up to which nothing can appear any more are kept in `settled_*`.
+    """
+    __tablename__ = "reconciliation_checkpoints"
+
+    # Job name, e.g. "payments"
+    name = Column(String(50), primary_key=True)
+
+    last_payment_id = Column(Integer, nullable=False, default=0, server_default="0")
+    last_stripe_payment_id = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # First transaction id not yet started when `last_*` were last moved forward
+    last_snapshot_xmax = Column(BigInteger, nullable=True)
+    settled_payment_id = Column(Integer, nullable=False, default=0, server_default="0")
+    settled_stripe_payment_id = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
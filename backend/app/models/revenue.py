@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, func
+
+from backend.app.database.database import Base
+
+
+class DailyRevenue(Base):
+    """
+    Completed payments per day, hostel and payment method.
+
+    Maintained by the revenue rollup job from the payments table, so revenue
+    analytics read a few rows per day instead of every payment. The day is
+    the UTC date the payment was made.
+    """
+    __tablename__ = "daily_revenue"
+
+    day = Column(Date, primary_key=True)
+    hostel_id = Column(Integer, ForeignKey("hostels.id", ondelete="CASCADE"), primary_key=True)
+    payment_method = Column(String(100), primary_key=True)
+
+    amount = Column(Float, nullable=False, default=0, server_default="0")
+    payment_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RevenueRollupCheckpoint(Base):
+    """
+    Time up to which payment changes are reflected in daily_revenue.
+    """
+    __tablename__ = "revenue_rollup_checkpoints"
+
+    # Rollup name, e.g. "daily_revenue"
+    name = Column(String(50), primary_key=True)
+    processed_until = Column(DateTime(timezone=True), nullable=True)
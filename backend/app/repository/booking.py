@@ -1,7 +1,16 @@
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import tuple_, select, update, func, null
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from sqlalchemy.exc import IntegrityError
 
-from backend.app.models.booking import Booking
+from backend.app.models.booking import Booking, BookingStatus
+from backend.app.models.hostels import Hostel, Room
+from backend.app.models.hostel_stats import HostelStats
+from backend.app.schemas.booking import BookingFilterSchema
+from backend.app.utils.pagination import CursorPosition
 
 
 class BookingRepository:
@@ -33,8 +42,181 @@ class BookingRepository:
     def get_booking_by_booking_id(self, booking_id: int) -> Booking:
         return self.session.query(Booking).filter(Booking.id == booking_id).first()
 
+    def get_booking_for_payment(self, booking_id: int) -> Optional[Booking]:
+        """
+        Loads a booking with its room and hostel in one query and locks the booking row
+        until the caller commits, so it cannot expire while it is being paid.
+        """
+        return (
+            self.session.query(Booking)
+            .options(joinedload(Booking.room), joinedload(Booking.hostel))
+            .filter(Booking.id == booking_id)
+            .with_for_update(of=Booking)
+            .first()
+        )
+
     def get_all_my_bookings(self, student_email: str):
         return self.session.query(Booking).filter(Booking.student_email == student_email).all()
 
     def get_all_room_booking_by_hostel_id(self, hostel_id: int):
         return self.session.query(Booking).filter(Booking.hostel_id == hostel_id).all()
+
+    def get_bookings_for_hostels(self, hostel_ids: Iterable[int]) -> Dict[int, List[Booking]]:
+        """
+        Loads the bookings of several hostels in a single query, grouped by hostel ID.
+        """
+        hostel_ids = list(hostel_ids)
+        bookings_by_hostel = defaultdict(list)
+        if not hostel_ids:
+            return bookings_by_hostel
+
+        bookings = self.session.query(Booking).filter(Booking.hostel_id.in_(hostel_ids)).all()
+        for booking in bookings:
+            bookings_by_hostel[booking.hostel_id].append(booking)
+        return bookings_by_hostel
+
+    @staticmethod
+    def _apply_filters(query, filters: BookingFilterSchema):
+        """
+        Narrows a booking query down to the bookings matching every given filter.
+        """
+        if filters.status is not None:
+            query = query.filter(Booking.status == BookingStatus[filters.status.name])
+        if filters.created_from is not None:
+            query = query.filter(Booking.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            query = query.filter(Booking.created_at < filters.created_to)
+        return query
+
+    def get_bookings_for_owner(self, owner_id: int, filters: BookingFilterSchema, limit: int = 10,
+                               after: Optional[CursorPosition] = None) -> List[Booking]:
+        """
+        Retrieves the bookings of every hostel of an owner newest first using keyset pagination.
+
+        Runs as a single query joined to the owner's hostels; each booking comes back with
+        its hostel loaded.
+
+        Args:
+            owner_id (int): The ID of the hostel owner.
+            filters (BookingFilterSchema): Booking status and creation date range.
+            limit (int): The maximum number of bookings to return (default: 10).
+            after (CursorPosition): The (created_at, id) of the last booking of the previous page.
+
+        Returns:
+            List[Booking]: A list of booking objects.
+        """
+        query = (
+            self.session.query(Booking)
+            .join(Booking.hostel)
+            .options(contains_eager(Booking.hostel).load_only(Hostel.name))
+            .filter(Hostel.user_id == owner_id)
+        )
+        query = self._apply_filters(query, filters)
+        if after is not None:
+            query = query.filter(tuple_(Booking.created_at, Booking.id) < after)
+
+        return query.order_by(Booking.created_at.desc(), Booking.id.desc()).limit(limit).all()
+
+    def stream_bookings_for_owner(self, owner_id: int, filters: BookingFilterSchema,
+                                  batch_size: int = 1000) -> Iterator:
+        """
+        Streams every booking of an owner's hostels newest first, without loading them all.
+
+        Plain column rows are fetched `batch_size` at a time through a server-side cursor,
+        so memory use does not grow with the number of bookings.
+
+        Args:
+            owner_id (int): The ID of the hostel owner.
+            filters (BookingFilterSchema): Booking status and creation date range.
+            batch_size (int): The number of rows fetched per round trip (default: 1000).
+
+        Yields:
+            Row: One row per booking, with the hostel name as `hostel_name`.
+        """
+        query = (
+            self.session.query(
+                Booking.id, Booking.hostel_id, Hostel.name.label("hostel_name"), Booking.room_id,
+                Booking.first_name, Booking.last_name, Booking.email_address, Booking.phone_number,
+                Booking.university, Booking.status, Booking.created_at, Booking.updated_at, Booking.expires_at
+            )
+            .join(Hostel, Hostel.id == Booking.hostel_id)
+            .filter(Hostel.user_id == owner_id)
+        )
+        query = self._apply_filters(query, filters)
+        query = query.order_by(Booking.created_at.desc(), Booking.id.desc()).execution_options(yield_per=batch_size)
+
+        try:
+            yield from query
+        finally:
+            # A streamed body is sent after the request's session has been closed, so the
+            # stream reopened it; close it again to hand the connection back to the pool
+            self.session.close()
+
+    def release_expired_holds(self, now: datetime, batch_size: int = 500) -> int:
+        """
+        Cancels up to `batch_size` pending bookings whose hold expired before `now`.
+
+        A single statement finds the expired holds through the (status, expires_at) index,
+        skipping rows other transactions have locked, cancels them, hands their places back
+        to their rooms and moves them from pending to cancelled in the hostel stats. Room
+        availability is the owner's open/closed flag and is left as it is.
+
+        Returns:
+            int: The number of bookings released.
+        """
+        expired = (
+            select(Booking.id)
+            .where(Booking.status == BookingStatus.PENDING, Booking.expires_at < now)
+            .order_by(Booking.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("expired")
+        )
+        released = (
+            update(Booking)
+            .where(Booking.id == expired.c.id)
+            .values(status=BookingStatus.CANCELLED, expires_at=null(), updated_at=now)
+            .returning(Booking.room_id, Booking.hostel_id)
+            .cte("released")
+        )
+
+        per_room = (
+            select(released.c.room_id, func.count().label("released"))
+            .group_by(released.c.room_id)
+            .cte("released_per_room")
+        )
+        occupancy = func.coalesce(Room.occupancy, 0)
+        rooms = (
+            update(Room)
+            .where(Room.id == per_room.c.room_id)
+            .values(occupancy=func.greatest(occupancy - per_room.c.released, 0))
+            .returning(Room.id)
+            .cte("released_rooms")
+        )
+
+        per_hostel = (
+            select(released.c.hostel_id, func.count().label("released"))
+            .group_by(released.c.hostel_id)
+            .cte("released_per_hostel")
+        )
+        stats = (
+            update(HostelStats)
+            .where(HostelStats.hostel_id == per_hostel.c.hostel_id)
+            .values(
+                pending_bookings=HostelStats.pending_bookings - per_hostel.c.released,
+                cancelled_bookings=HostelStats.cancelled_bookings + per_hostel.c.released,
+                occupancy=HostelStats.occupancy - per_hostel.c.released,
+            )
+            .returning(HostelStats.hostel_id)
+            .cte("released_stats")
+        )
+
+        # Every data-modifying CTE must be referenced to be rendered
+        statement = select(
+            select(func.count()).select_from(released).scalar_subquery(),
+            select(func.count()).select_from(rooms).scalar_subquery(),
+            select(func.count()).select_from(stats).scalar_subquery(),
+        )
+        released_count, _, _ = self.session.execute(statement).one()
+        self.session.commit()
+        return released_count
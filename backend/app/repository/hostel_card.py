@@ -0,0 +1,109 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, tuple_, text
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by
+from typing import Iterable, List, Optional
+import logging
+
+from backend.app.models.hostel_card import HostelCard
+from backend.app.models.hostels import Hostel, Room
+from backend.app.models.images import ImageMetaData
+from backend.app.utils.pagination import CursorPosition
+
+logger = logging.getLogger(__name__)
+
+
+class HostelCardRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def refresh_hostel_cards(self, hostel_ids: Iterable[int], commit: bool = True):
+        """
+        Rebuilds the listing cards of the given hostels from hostels, rooms and images.
+
+        Runs as a single INSERT ... SELECT ... ON CONFLICT DO UPDATE, so it costs one
+        statement however many hostels are refreshed.
+
+        Args:
+            hostel_ids (Iterable[int]): The IDs of the hostels whose data changed.
+            commit (bool): Commit the refresh. When False the pending writes of the session are
+                flushed first and the refresh is left for the caller to commit with them.
+        """
+        hostel_ids = list(hostel_ids)
+        if not hostel_ids:
+            return
+        if not commit:
+            self.session.flush()
+
+        images = (
+            select(func.coalesce(
+                func.jsonb_agg(aggregate_order_by(
+                    func.jsonb_build_object(
+                        "bucket_name", ImageMetaData.bucket_name,
+                        "object_name", ImageMetaData.object_name,
+                        "version_id", ImageMetaData.version_id,
+                    ),
+                    ImageMetaData.id
+                )),
+                text("'[]'::jsonb")
+            ))
+            .where(ImageMetaData.hostel_id == Hostel.id)
+            .scalar_subquery()
+        )
+        room_count = select(func.count(Room.id)).where(Room.hostel_id == Hostel.id).scalar_subquery()
+        min_room_price = select(func.min(Room.price_per_semester)).where(Room.hostel_id == Hostel.id).scalar_subquery()
+
+        source = select(
+            Hostel.id, Hostel.name, Hostel.description, Hostel.location, Hostel.user_id, Hostel.average_price,
+            Hostel.available_rooms, Hostel.amenities, Hostel.rules, images, room_count, min_room_price,
+            Hostel.created_at, Hostel.updated_at, func.now()
+        ).where(Hostel.id.in_(hostel_ids))
+
+        columns = ["hostel_id", "name", "description", "location", "owner_id", "average_price", "available_rooms",
+                   "amenities", "rules", "images", "room_count", "min_room_price", "created_at", "updated_at",
+                   "refreshed_at"]
+        statement = insert(HostelCard).from_select(columns, source)
+        statement = statement.on_conflict_do_update(
+            index_elements=[HostelCard.hostel_id],
+            set_={column: statement.excluded[column] for column in columns if column != "hostel_id"}
+        )
+
+        self.session.execute(statement)
+        if commit:
+            self.session.commit()
+        logger.info(f"Hostel cards refreshed: {hostel_ids}")
+
+    def refresh_hostel_card(self, hostel_id: int, commit: bool = True):
+        self.refresh_hostel_cards([hostel_id], commit=commit)
+
+    def delete_hostel_card(self, hostel_id: int, commit: bool = True):
+        self.session.query(HostelCard).filter(HostelCard.hostel_id == hostel_id).delete(synchronize_session=False)
+        if commit:
+            self.session.commit()
+
+    def get_hostel_cards(self, limit: int = 10, after: Optional[CursorPosition] = None) -> List[HostelCard]:
+        """
+        Retrieves hostel cards newest first using keyset pagination on (created_at, hostel_id).
+
+        Args:
+            limit (int): The maximum number of cards to return (default: 10).
+            after (CursorPosition): The (created_at, hostel_id) of the last card of the previous page.
+
+        Returns:
+            List[HostelCard]: A list of hostel card objects.
+        """
+        query = self.session.query(HostelCard)
+        if after is not None:
+            query = query.filter(tuple_(HostelCard.created_at, HostelCard.hostel_id) < after)
+        return query.order_by(HostelCard.created_at.desc(), HostelCard.hostel_id.desc()).limit(limit).all()
+
+    def get_catalogue_version(self):
+        """
+        Returns cheap markers that change whenever any hostel card changes.
+
+        Returns:
+            Row: (`card_count`, `last_refreshed_at`) over all hostel cards.
+        """
+        return self.session.query(
+            func.count(HostelCard.hostel_id).label("card_count"),
+            func.max(HostelCard.refreshed_at).label("last_refreshed_at")
+        ).one()
@@ -0,0 +1,127 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Iterable, Optional
+
+from backend.app.models.hostel_stats import HostelStats
+from backend.app.models.booking import Booking, BookingStatus
+from backend.app.models.hostels import Room
+
+# Column counting the bookings in each status
+BOOKING_STATUS_COLUMNS = {
+    BookingStatus.PENDING: "pending_bookings",
+    BookingStatus.CONFIRMED: "confirmed_bookings",
+    BookingStatus.CANCELLED: "cancelled_bookings",
+}
+
+
+class HostelStatsRepository:
+    """
+    Keeps the hostel_stats row of each hostel up to date.
+
+    None of the methods commit: each one stages an upsert in the caller's
+    session, to be committed together with the booking, payment or room
+    write it accounts for.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def increment(self, hostel_id: Optional[int], **deltas):
+        """
+        Adds the given deltas to a hostel's stats, creating the row if it does not exist yet.
+
+        Args:
+            hostel_id (int): The ID of the hostel.
+            **deltas: Amounts to add, keyed by HostelStats column. Values may be SQL expressions.
+        """
+        deltas = {column: delta for column, delta in deltas.items()
+                  if not (isinstance(delta, (int, float)) and delta == 0)}
+        if hostel_id is None or not deltas:
+            return
+
+        statement = insert(HostelStats).values(hostel_id=hostel_id, **deltas)
+        statement = statement.on_conflict_do_update(
+            index_elements=[HostelStats.hostel_id],
+            set_={
+                **{column: getattr(HostelStats, column) + statement.excluded[column] for column in deltas},
+                "updated_at": func.now(),
+            }
+        )
+        self.session.execute(statement)
+
+    def record_booking(self, hostel_id: int, room_id: int, booking_status: BookingStatus = BookingStatus.PENDING):
+        """
+        Accounts for a new booking of a room, priced at the room's semester price.
+        """
+        room_price = select(Room.price_per_semester).where(Room.id == room_id).scalar_subquery()
+        self.increment(hostel_id, **{BOOKING_STATUS_COLUMNS[booking_status]: 1},
+                       booking_revenue=func.coalesce(room_price, 0))
+
+    def record_booking_status_change(self, hostel_id: int, previous: BookingStatus, current: BookingStatus):
+        """
+        Moves a booking from one status count to another.
+        """
+        if previous == current:
+            return
+        self.increment(hostel_id, **{BOOKING_STATUS_COLUMNS[previous]: -1, BOOKING_STATUS_COLUMNS[current]: 1})
+
+    def record_payment(self, hostel_id: int, amount: float, confirmed_from: Optional[BookingStatus] = None):
+        """
+        Accounts for a completed payment.
+
+        Args:
+            hostel_id (int): The ID of the hostel.
+            amount (float): The amount paid.
+            confirmed_from (BookingStatus): The previous status of the booking the payment
+                confirms, if it does; its count moves to confirmed in the same upsert.
+        """
+        deltas = {"amount_paid": amount}
+        if confirmed_from is not None and confirmed_from != BookingStatus.CONFIRMED:
+            deltas[BOOKING_STATUS_COLUMNS[confirmed_from]] = -1
+            deltas[BOOKING_STATUS_COLUMNS[BookingStatus.CONFIRMED]] = 1
+        self.increment(hostel_id, **deltas)
+
+    def record_room(self, room_id: Optional[int], hostel_id: int, capacity: int, occupancy: Optional[int],
+                    price_per_semester: float, sign: int = 1):
+        """
+        Adds (sign=1) or removes (sign=-1) a room and the bookings made on it.
+
+        A room update is recorded as removing the room with its previous values and
+        adding it back with the new ones, which also reprices its existing bookings.
+
+        Args:
+            room_id (int): The ID of the room, None for a room that is not saved yet.
+            hostel_id (int): The hostel the room belongs to.
+            capacity (int): The room capacity.
+            occupancy (int): The room occupancy.
+            price_per_semester (float): The room price, which each of its bookings adds to the revenue.
+            sign (int): 1 to add the room, -1 to remove it.
+        """
+        self.increment(hostel_id, room_count=sign, capacity=sign * (capacity or 0),
+                       occupancy=sign * (occupancy or 0))
+        if room_id is None:
+            return
+
+        # Bookings count towards the hostel they were made for
+        bookings = (
+            self.session.query(Booking.hostel_id, Booking.status, func.count(Booking.id))
+            .filter(Booking.room_id == room_id)
+            .group_by(Booking.hostel_id, Booking.status)
+            .all()
+        )
+        for booking_hostel_id, booking_status, count in bookings:
+            deltas = {"booking_revenue": sign * count * price_per_semester}
+            if booking_status in BOOKING_STATUS_COLUMNS:
+                deltas[BOOKING_STATUS_COLUMNS[booking_status]] = sign * count
+            self.increment(booking_hostel_id, **deltas)
+
+    def get_stats_for_hostels(self, hostel_ids: Iterable[int]) -> Dict[int, HostelStats]:
+        """
+        Loads the stats rows of several hostels in a single query, keyed by hostel ID.
+        """
+        hostel_ids = list(hostel_ids)
+        if not hostel_ids:
+            return {}
+        rows = self.session.query(HostelStats).filter(HostelStats.hostel_id.in_(hostel_ids)).all()
+        return {row.hostel_id: row for row in rows}
@@ -1,14 +1,23 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func
-from typing import List, Dict
+from sqlalchemy import func, tuple_, cast, Float, String, or_, select, literal, union_all, true
+from sqlalchemy.dialects.postgresql import array
+from typing import List, Dict, Optional, Sequence
 import logging
 
-from backend.app.models.hostels import Hostel
+from backend.app.models.hostels import Hostel, normalize_amenities
+from backend.app.models.hostel_card import HostelCard
+from backend.app.schemas.hostels import HostelFilterSchema
+from backend.app.utils.pagination import CursorPosition, RankPosition
 
 logger = logging.getLogger(__name__)
 
 
+def _escape_like(value: str) -> str:
+    # Backslash is Postgres' default LIKE escape character
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class HostelRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -34,6 +43,24 @@ class HostelRepository:
             logger.error(f"Failed to create hostel: {str(e)}")
             raise
 
+    def add_hostel(self, hostel: Hostel):
+        """
+        Stages a new hostel without committing, flushed so that it has its ID.
+
+        Args:
+            hostel (Hostel): The hostel object to add.
+
+        Raises:
+            IntegrityError: If there is a violation of database constraints.
+        """
+        try:
+            self.session.add(hostel)
+            self.session.flush()
+        except IntegrityError as e:
+            self.session.rollback()
+            logger.error(f"Failed to create hostel: {str(e)}")
+            raise
+
     def update_hostel(self, hostel: Hostel):
         """
         Updates an existing hostel in the database.
@@ -65,18 +92,29 @@ class HostelRepository:
         self.session.commit()
         logger.info(f"Hostel marked as deleted: {hostel.name}")
 
-    def get_all_hostels(self, page: int = 1, per_page: int = 10):
+    def _keyset_page(self, query, limit: Optional[int], after: Optional[CursorPosition]):
         """
-        Retrieves all hostels with pagination.
+        Orders a hostel query newest first and applies keyset pagination on (created_at, id).
+        """
+        if after is not None:
+            query = query.filter(tuple_(Hostel.created_at, Hostel.id) < after)
+        query = query.order_by(Hostel.created_at.desc(), Hostel.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_all_hostels(self, limit: int = 10, after: Optional[CursorPosition] = None):
+        """
+        Retrieves hostels newest first using keyset pagination.
 
         Args:
-            page (int): The page number (default: 1).
-            per_page (int): The number of items per page (default: 10).
+            limit (int): The maximum number of hostels to return (default: 10).
+            after (CursorPosition): The (created_at, id) of the last hostel of the previous page.
 
         Returns:
             List[Hostel]: A list of hostel objects.
         """
-        return self.session.query(Hostel).offset((page - 1) * per_page).limit(per_page).all()
+        return self._keyset_page(self.session.query(Hostel), limit, after)
 
     def get_hostel_by_name(self, name: str) -> Hostel:
         """
@@ -106,21 +144,23 @@ class HostelRepository:
             raise ValueError("Owner ID must be an integer")
         return self.session.query(Hostel).filter(Hostel.user_id == owner_id).first()
 
-    def get_all_hostels_by_one_owner(self, owner_id: int, page: int = 1, per_page: int = 10):
+    def get_all_hostels_by_one_owner(self, owner_id: int, limit: Optional[int] = None,
+                                     after: Optional[CursorPosition] = None):
         """
-        Retrieves all hostels owned by a specific owner with pagination.
+        Retrieves hostels owned by a specific owner newest first using keyset pagination.
 
         Args:
             owner_id (int): The ID of the owner.
-            page (int): The page number (default: 1).
-            per_page (int): The number of items per page (default: 10).
+            limit (int): The maximum number of hostels to return (default: all of them).
+            after (CursorPosition): The (created_at, id) of the last hostel of the previous page.
 
         Returns:
             List[Hostel]: A list of hostel objects.
         """
         if not isinstance(owner_id, int):
             raise ValueError("Owner ID must be an integer")
-        return self.session.query(Hostel).filter(Hostel.user_id == owner_id).offset((page - 1) * per_page).limit(per_page).all()
+        query = self.session.query(Hostel).filter(Hostel.user_id == owner_id)
+        return self._keyset_page(query, limit, after)
 
     def get_hostel_by_id(self, hostel_id: int) -> Hostel:
         """
@@ -136,31 +176,174 @@ class HostelRepository:
             raise ValueError("Hostel ID must be an integer")
         return self.session.query(Hostel).filter(Hostel.id == hostel_id).first()
 
-    def search_hostels(self, query) -> List[Dict]:
+    def search_hostels(self, query: str, limit: int = 10, after: Optional[RankPosition] = None) -> List[Dict]:
         """
         Searches for hostels using full-text search with highlighted descriptions.
 
+        Matches are ranked with ts_rank_cd and paged by (rank, id) first; ts_headline,
+        the expensive part, only runs on the rows of the page that is returned, and
+        each result is read from its precomputed hostel card. A hostel without a card
+        is still returned, with a `card` of None, so pages are never short.
+
         Args:
             query (str): The search query.
+            limit (int): The maximum number of results to return (default: 10).
+            after (RankPosition): The (rank, id) of the last result of the previous page.
 
         Returns:
-            List[Dict]: A list of dictionaries containing hostel objects and highlighted descriptions.
+            List[Dict]: A list of dictionaries containing hostel IDs, hostel cards, highlighted descriptions and ranks.
         """
 
         ts_query = func.plainto_tsquery("english", query)  # Converts input into a tsquery
+        # Cast to double precision so the rank round-trips exactly through the cursor
+        rank = cast(func.ts_rank_cd(Hostel.search_vector, ts_query), Float)
+
+        page_query = self.session.query(Hostel.id.label("id"), rank.label("rank")).filter(
+            Hostel.search_vector.op("@@")(ts_query)
+        )
+        if after is not None:
+            page_query = page_query.filter(tuple_(rank, Hostel.id) < after)
+        page = page_query.order_by(rank.desc(), Hostel.id.desc()).limit(limit).subquery()
 
         results = (
             self.session.query(
-                Hostel,
+                page.c.id,
+                HostelCard,
+                page.c.rank,
                 func.coalesce(
-                    func.ts_headline("english", Hostel.description, ts_query, 'StartSel=<b>,StopSel=</b>'),
-                    Hostel.description  # Fallback to original description
+                    func.ts_headline("english", HostelCard.description, ts_query, 'StartSel=<b>,StopSel=</b>'),
+                    HostelCard.description  # Fallback to original description
                 ).label("highlighted_description")
-            ).filter(
-                Hostel.search_vector.op("@@")(ts_query)
+            ).select_from(page).outerjoin(
+                HostelCard, HostelCard.hostel_id == page.c.id
             ).order_by(
-                func.ts_rank_cd(Hostel.search_vector, ts_query).desc()
+                page.c.rank.desc(), page.c.id.desc()
             ).all()
         )
 
-        return [{"hostel": hostel, "highlighted_description": highlight} for hostel, highlight in results]
\ No newline at end of file
+        return [{"hostel_id": hostel_id, "card": card, "highlighted_description": highlight, "rank": rank}
+                for hostel_id, card, rank, highlight in results]
+
+    def count_search_results(self, query: str, cap: int = 1000) -> int:
+        """
+        Counts the hostels matching a full-text search, stopping at `cap`.
+
+        Args:
+            query (str): The search query.
+            cap (int): The most matches to count before giving up (default: 1000).
+
+        Returns:
+            int: The number of matches, or `cap` if there are at least that many.
+        """
+        ts_query = func.plainto_tsquery("english", query)
+        matches = (
+            self.session.query(Hostel.id)
+            .filter(Hostel.search_vector.op("@@")(ts_query))
+            .limit(cap)
+            .subquery()
+        )
+        return self.session.query(func.count()).select_from(matches).scalar()
+
+    def suggest_hostels(self, query: str, limit: int = 5):
+        """
+        Suggests hostels whose name or location resembles a partial, possibly misspelled query.
+
+        Uses the pg_trgm GIN indexes on name and location: prefix matches on the name and
+        word-similarity matches on either column, best match first.
+
+        Args:
+            query (str): What the user has typed so far.
+            limit (int): The maximum number of suggestions (default: 5).
+
+        Returns:
+            List[Row]: Rows with the hostel `id` and `name` only.
+        """
+        score = func.greatest(func.word_similarity(query, Hostel.name), func.word_similarity(query, Hostel.location))
+
+        return (
+            self.session.query(Hostel.id, Hostel.name)
+            .filter(
+                or_(
+                    Hostel.name.ilike(f"{_escape_like(query)}%"),
+                    Hostel.name.op("%>")(query),
+                    Hostel.location.op("%>")(query),
+                )
+            )
+            .order_by(score.desc(), Hostel.name)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def _apply_filters(query, filters: HostelFilterSchema):
+        """
+        Narrows a hostel query down to the hostels matching every given filter.
+        """
+        if filters.min_price is not None:
+            query = query.filter(Hostel.average_price >= filters.min_price)
+        if filters.max_price is not None:
+            query = query.filter(Hostel.average_price <= filters.max_price)
+        if filters.min_available_rooms is not None:
+            query = query.filter(Hostel.available_rooms >= filters.min_available_rooms)
+        if filters.max_available_rooms is not None:
+            query = query.filter(Hostel.available_rooms <= filters.max_available_rooms)
+        if filters.location:
+            query = query.filter(Hostel.location == filters.location)
+        required_amenities = normalize_amenities(filters.amenities)
+        if required_amenities:
+            # amenity_tags @> ARRAY[...] is answered by the GIN index on amenity_tags
+            query = query.filter(Hostel.amenity_tags.contains(required_amenities))
+        return query
+
+    def filter_hostels(self, filters: HostelFilterSchema, limit: int = 10, after: Optional[CursorPosition] = None):
+        """
+        Retrieves hostels matching the given filters newest first using keyset pagination.
+
+        Args:
+            filters (HostelFilterSchema): Price and room ranges, location and required amenities.
+            limit (int): The maximum number of hostels to return (default: 10).
+            after (CursorPosition): The (created_at, id) of the last hostel of the previous page.
+
+        Returns:
+            List[Hostel]: A list of hostel objects.
+        """
+        query = self._apply_filters(self.session.query(Hostel), filters)
+        return self._keyset_page(query, limit, after)
+
+    def get_hostel_facets(self, filters: HostelFilterSchema, price_boundaries: Sequence[int]):
+        """
+        Counts the hostels matching the given filters by location, price range and amenity.
+
+        All facets come back from a single statement over the filtered hostels.
+
+        Args:
+            filters (HostelFilterSchema): Price and room ranges, location and required amenities.
+            price_boundaries (Sequence[int]): Ascending lower bounds of the price ranges.
+
+        Returns:
+            List[Row]: Rows of (facet, value, count). Price range values are width_bucket
+            indexes into `price_boundaries`, 0 meaning below the first boundary.
+        """
+        filtered = self._apply_filters(
+            self.session.query(Hostel.id, Hostel.location, Hostel.average_price, Hostel.amenity_tags), filters
+        ).cte("filtered_hostels")
+
+        location_facet = (
+            select(literal("location").label("facet"), filtered.c.location.label("value"), func.count().label("count"))
+            .group_by(filtered.c.location)
+        )
+
+        price_bucket = func.width_bucket(filtered.c.average_price, array(list(price_boundaries)))
+        price_facet = (
+            select(literal("price_range"), cast(price_bucket, String), func.count())
+            .group_by(price_bucket)
+        )
+
+        amenity_tags = func.unnest(filtered.c.amenity_tags).table_valued("tag").lateral()
+        amenity_facet = (
+            select(literal("amenity"), amenity_tags.c.tag, func.count())
+            .select_from(filtered.join(amenity_tags, true()))
+            .group_by(amenity_tags.c.tag)
+        )
+
+        return self.session.execute(union_all(location_facet, price_facet, amenity_facet)).all()
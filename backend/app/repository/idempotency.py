@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select, delete, tuple_, null, or_, and_
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.app.models.idempotency import IdempotencyKey
+
+
+class IdempotencyRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def claim_key(self, scope: str, key: str, request_hash: str, ttl: int, lease: int) -> Optional[IdempotencyKey]:
+        """
+        Claims an idempotency key for a new request, unless it is already in use.
+
+        A single INSERT ... ON CONFLICT DO UPDATE claims a new key or takes over an
+        expired one, or one still in progress after `lease` seconds, left behind by a
+        worker that died; the claim is committed straight away so concurrent retries see it.
+
+        Args:
+            scope (str): The endpoint the key is used on.
+            key (str): The client supplied Idempotency-Key.
+            request_hash (str): SHA-256 of the request body.
+            ttl (int): Seconds the key stays valid.
+            lease (int): Seconds a request may hold the key without completing it.
+
+        Returns:
+            IdempotencyKey: The existing, unexpired entry for the key, or None if the
+            key was claimed and the request should be handled.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        statement = insert(IdempotencyKey).values(
+            scope=scope, key=key, request_hash=request_hash, expires_at=expires_at
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+            set_={
+                "request_hash": statement.excluded.request_hash,
+                "status_code": null(),
+                "response_body": null(),
+                "created_at": func.now(),
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=or_(
+                IdempotencyKey.expires_at < func.now(),
+                and_(IdempotencyKey.status_code.is_(None),
+                     IdempotencyKey.created_at < func.now() - timedelta(seconds=lease)),
+            )
+        ).returning(IdempotencyKey.key)
+
+        claimed = self.session.execute(statement).first()
+        self.session.commit()
+        if claimed is not None:
+            return None
+
+        return self.session.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key
+        ).first()
+
+    def complete_key(self, scope: str, key: str, status_code: int, response_body):
+        self.session.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key
+        ).update({"status_code": status_code, "response_body": response_body}, synchronize_session=False)
+        self.session.commit()
+
+    def release_key(self, scope: str, key: str):
+        """
+        Forgets a claimed key whose request failed, so that a retry is handled again.
+        """
+        self.session.rollback()
+        self.session.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status_code.is_(None)
+        ).delete(synchronize_session=False)
+        self.session.commit()
+
+    def delete_expired_keys(self, batch_size: int = 1000) -> int:
+        """
+        Deletes up to `batch_size` expired keys.
+
+        Returns:
+            int: The number of keys deleted.
+        """
+        expired = (
+            select(IdempotencyKey.scope, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < func.now())
+            .limit(batch_size)
+        )
+        result = self.session.execute(
+            delete(IdempotencyKey)
+            .where(tuple_(IdempotencyKey.scope, IdempotencyKey.key).in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        self.session.commit()
+        return result.rowcount
@@ -1,3 +1,6 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -35,4 +38,20 @@ class ImageMetaDataRepository:
         return self.session.query(ImageMetaData).filter(ImageMetaData.room_id == room_id).all()
 
     def get_image_metadata_by_hostel_id(self, hostel_id: int):
-        return self.session.query(ImageMetaData).filter(ImageMetaData.hostel_id == hostel_id).all()
\ No newline at end of file
+        return self.session.query(ImageMetaData).filter(ImageMetaData.hostel_id == hostel_id).all()
+
+    def get_image_metadata_for_hostels(self, hostel_ids: Iterable[int]) -> Dict[int, List[ImageMetaData]]:
+        hostel_ids = list(hostel_ids)
+        images_by_hostel = defaultdict(list)
+        if not hostel_ids:
+            return images_by_hostel
+
+        images = (
+            self.session.query(ImageMetaData)
+            .filter(ImageMetaData.hostel_id.in_(hostel_ids))
+            .order_by(ImageMetaData.hostel_id, ImageMetaData.id)
+            .all()
+        )
+        for image in images:
+            images_by_hostel[image.hostel_id].append(image)
+        return images_by_hostel
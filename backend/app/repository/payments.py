@@ -1,7 +1,13 @@
+from typing import Dict, Tuple
+
+from sqlalchemy import select, update, union, func, case, and_, cast, literal, null
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from backend.app.models.payments import Payment
+from backend.app.models.payments import Payment, PaymentStatus, StripePayment, StripePaymentStatus, ReconciliationIssue
+
+# Largest difference between a payment and its Stripe payment still treated as equal
+AMOUNT_TOLERANCE = 0.005
 
 
 class PaymentRepository:
@@ -11,9 +17,11 @@ class PaymentRepository:
     def make_payment(self, payment: Payment):
         try:
             self.session.add(payment)
+            # The id is known after the flush, no need to reload the payment after committing
+            self.session.flush()
+            payment_id = payment.id
             self.session.commit()
-            self.session.refresh(payment)
-            return payment.id
+            return payment_id
         except IntegrityError:
             self.session.rollback()
             raise
@@ -35,4 +43,91 @@ class PaymentRepository:
         return self.session.query(Payment).filter(Payment.transaction_id == transaction_id).first()
 
     def get_payment_by_booking_id(self, booking_id: int) -> Payment:
-        return self.session.query(Payment).filter(Payment.booking_id == booking_id).first()
\ No newline at end of file
+        return self.session.query(Payment).filter(Payment.booking_id == booking_id).first()
+
+    def get_latest_ids(self) -> Tuple[int, int]:
+        """
+        Returns the highest payment id and the highest Stripe payment id, 0 for an empty table.
+        """
+        return self.session.execute(select(
+            select(func.coalesce(func.max(Payment.id), 0)).scalar_subquery(),
+            select(func.coalesce(func.max(StripePayment.id), 0)).scalar_subquery(),
+        )).one()
+
+    def reconcile_payments(self, after_payment_id: int, upto_payment_id: int,
+                           after_stripe_payment_id: int, upto_stripe_payment_id: int,
+                           unreconciled_only: bool = False) -> Dict[tuple, int]:
+        """
+        Matches payments to Stripe payments by transaction id in one statement, without committing.
+
+        The payments reconciled are those with an id in (after_payment_id, upto_payment_id],
+        only the ones never reconciled with `unreconciled_only`, plus older ones matched by a
+        Stripe payment with an id in the Stripe range, which covers webhooks that arrived
+        after their payment was first reconciled.
+
+        A payment without a Stripe payment, or whose amount or booking disagree with it, is
+        marked with a ReconciliationIssue and keeps its status (pending becomes not received).
+        Otherwise the Stripe status is carried over: completed completes the payment, failed
+        fails a payment that is still pending or not received.
+
+        Returns:
+            Dict[tuple, int]: The number of payments per (PaymentStatus, ReconciliationIssue).
+        """
+        in_range = and_(Payment.id > after_payment_id, Payment.id <= upto_payment_id)
+        if unreconciled_only:
+            in_range = and_(in_range, Payment.reconciled_at.is_(None))
+        candidates = union(
+            select(Payment.id).where(in_range),
+            select(Payment.id)
+            .join(StripePayment, StripePayment.transaction_id == Payment.transaction_id)
+            .where(StripePayment.id > after_stripe_payment_id, StripePayment.id <= upto_stripe_payment_id,
+                   Payment.id <= upto_payment_id),
+        ).cte("candidates")
+
+        # Cast, or the CASE over bare parameters comes out as text and cannot be assigned to the enum column
+        issue_type = Payment.reconciliation_issue.type
+        issue = case(
+            (StripePayment.id.is_(None), cast(literal(ReconciliationIssue.MISSING_STRIPE_PAYMENT, issue_type), issue_type)),
+            (and_(StripePayment.booking_id.isnot(None), StripePayment.booking_id != Payment.booking_id),
+             cast(literal(ReconciliationIssue.BOOKING_MISMATCH, issue_type), issue_type)),
+            (func.abs(StripePayment.amount_received - Payment.amount) > AMOUNT_TOLERANCE,
+             cast(literal(ReconciliationIssue.AMOUNT_MISMATCH, issue_type), issue_type)),
+            else_=null(),
+        )
+        # The latest Stripe payment of a transaction wins
+        matched = (
+            select(Payment.id.label("payment_id"), StripePayment.id.label("stripe_payment_id"),
+                   StripePayment.stripe_payment_status, issue.label("issue"))
+            .join(candidates, candidates.c.id == Payment.id)
+            .outerjoin(StripePayment, StripePayment.transaction_id == Payment.transaction_id)
+            .distinct(Payment.id)
+            .order_by(Payment.id, StripePayment.id.desc())
+            .cte("matched")
+        )
+
+        status_type = Payment.payment_status.type
+        pending = literal(PaymentStatus.PENDING, status_type)
+        not_received = literal(PaymentStatus.NOT_RECEIVED, status_type)
+        payment_status = case(
+            (and_(matched.c.stripe_payment_id.is_(None), Payment.payment_status == pending), not_received),
+            (matched.c.issue.isnot(None), Payment.payment_status),
+            (matched.c.stripe_payment_status == StripePaymentStatus.COMPLETED,
+             literal(PaymentStatus.COMPLETED, status_type)),
+            (and_(matched.c.stripe_payment_status == StripePaymentStatus.FAILED,
+                  Payment.payment_status.in_([pending, not_received])),
+             literal(PaymentStatus.FAILED, status_type)),
+            else_=Payment.payment_status,
+        )
+        reconciled = (
+            update(Payment)
+            .where(Payment.id == matched.c.payment_id)
+            .values(payment_status=payment_status, reconciliation_issue=matched.c.issue, reconciled_at=func.now())
+            .returning(Payment.payment_status, Payment.reconciliation_issue)
+            .cte("reconciled")
+        )
+
+        rows = self.session.execute(
+            select(reconciled.c.payment_status, reconciled.c.reconciliation_issue, func.count())
+            .group_by(reconciled.c.payment_status, reconciled.c.reconciliation_issue)
+        ).all()
+        return {(payment_status, issue): count for payment_status, issue, count in rows}
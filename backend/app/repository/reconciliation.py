@@ -0,0 +1,56 @@
+from typing import Tuple
+
+from sqlalchemy import select, func, cast, Text, BigInteger
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.app.models.reconciliation import ReconciliationCheckpoint
+
+
+class ReconciliationRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def lock_checkpoint(self, name: str) -> ReconciliationCheckpoint:
+        """
+        Returns the checkpoint of a job, creating it at zero the first time, locked until
+        the caller commits so two runs of the same job cannot overlap.
+        """
+        self.session.execute(
+            insert(ReconciliationCheckpoint).values(name=name).on_conflict_do_nothing(
+                index_elements=[ReconciliationCheckpoint.name]
+            )
+        )
+        return self.session.query(ReconciliationCheckpoint).filter(
+            ReconciliationCheckpoint.name == name
+        ).with_for_update().one()
+
+    def get_snapshot_xids(self) -> Tuple[int, int]:
+        """
+        Returns the oldest transaction id still running and the first one not started yet.
+        """
+        snapshot = func.pg_current_snapshot()
+        # xid8 has no cast to bigint, it goes through text
+        return self.session.execute(select(
+            cast(cast(func.pg_snapshot_xmin(snapshot), Text), BigInteger),
+            cast(cast(func.pg_snapshot_xmax(snapshot), Text), BigInteger),
+        )).one()
+
+    def advance_checkpoint(self, checkpoint: ReconciliationCheckpoint, last_payment_id: int,
+                           last_stripe_payment_id: int, snapshot_xmax: int):
+        """
+        Moves the checkpoint forward and commits it with the work it covers.
+        """
+        checkpoint.last_payment_id = last_payment_id
+        checkpoint.last_stripe_payment_id = last_stripe_payment_id
+        checkpoint.last_snapshot_xmax = snapshot_xmax
+        self.session.commit()
+
+    def settle_checkpoint(self, checkpoint: ReconciliationCheckpoint, settled_payment_id: int,
+                          settled_stripe_payment_id: int):
+        """
+        Records the ids below which no row can appear any more and commits it with the work it covers.
+        """
+        checkpoint.settled_payment_id = settled_payment_id
+        checkpoint.settled_stripe_payment_id = settled_stripe_payment_id
+        self.session.commit()
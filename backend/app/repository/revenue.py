@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, delete, func, cast, and_, exists, Date, true
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.app.models.revenue import DailyRevenue, RevenueRollupCheckpoint
+from backend.app.models.payments import Payment, PaymentStatus
+from backend.app.models.booking import Booking
+from backend.app.models.hostels import Hostel
+from backend.app.schemas.hostels import RevenueQuerySchema
+
+
+class RevenueRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def lock_checkpoint(self, name: str) -> Optional[RevenueRollupCheckpoint]:
+        """
+        Returns the checkpoint of a rollup, locked until the caller commits, or None if
+        another run holds it.
+        """
+        self.session.execute(
+            insert(RevenueRollupCheckpoint).values(name=name).on_conflict_do_nothing(
+                index_elements=[RevenueRollupCheckpoint.name]
+            )
+        )
+        self.session.commit()
+        return self.session.query(RevenueRollupCheckpoint).filter(
+            RevenueRollupCheckpoint.name == name
+        ).with_for_update(skip_locked=True).first()
+
+    def advance_checkpoint(self, checkpoint: RevenueRollupCheckpoint, processed_until: datetime):
+        checkpoint.processed_until = processed_until
+        self.session.commit()
+
+    def get_database_time(self) -> datetime:
+        return self.session.execute(select(func.now())).scalar_one()
+
+    def refresh_daily_revenue(self, since: Optional[datetime]) -> int:
+        """
+        Recomputes the daily_revenue rows of every (day, hostel) that has a payment written
+        or changed after `since` (all of them when None), without committing.
+
+        Buckets are recomputed from their payments rather than incremented, so a payment
+        changing status is reflected and processing a change twice is harmless. Methods
+        left without completed payments are removed from the bucket.
+
+        Returns:
+            int: The number of (day, hostel) buckets recomputed.
+        """
+        day = cast(func.timezone("UTC", Payment.created_at), Date)
+        changed_at = func.coalesce(Payment.updated_at, Payment.created_at)
+
+        changed = (
+            select(day.label("day"), Booking.hostel_id)
+            .join(Booking, Booking.id == Payment.booking_id)
+            .where(changed_at > since if since is not None else true())
+            .distinct()
+            .cte("changed")
+        )
+        totals = (
+            select(day.label("day"), Booking.hostel_id, Payment.payment_method,
+                   func.sum(Payment.amount).label("amount"), func.count().label("payment_count"))
+            .join(Booking, Booking.id == Payment.booking_id)
+            .join(changed, and_(changed.c.hostel_id == Booking.hostel_id, changed.c.day == day))
+            .where(Payment.payment_status == PaymentStatus.COMPLETED)
+            .group_by(day, Booking.hostel_id, Payment.payment_method)
+            .cte("totals")
+        )
+
+        statement = insert(DailyRevenue).from_select(
+            ["day", "hostel_id", "payment_method", "amount", "payment_count"],
+            select(totals.c.day, totals.c.hostel_id, totals.c.payment_method, totals.c.amount, totals.c.payment_count)
+        )
+        upserted = statement.on_conflict_do_update(
+            index_elements=[DailyRevenue.day, DailyRevenue.hostel_id, DailyRevenue.payment_method],
+            set_={
+                "amount": statement.excluded.amount,
+                "payment_count": statement.excluded.payment_count,
+                "updated_at": func.now(),
+            }
+        ).returning(DailyRevenue.day).cte("upserted")
+
+        emptied = (
+            delete(DailyRevenue)
+            .where(
+                DailyRevenue.day == changed.c.day,
+                DailyRevenue.hostel_id == changed.c.hostel_id,
+                ~exists().where(
+                    totals.c.day == DailyRevenue.day,
+                    totals.c.hostel_id == DailyRevenue.hostel_id,
+                    totals.c.payment_method == DailyRevenue.payment_method,
+                )
+            )
+            .returning(DailyRevenue.day)
+            .cte("emptied")
+        )
+
+        # Every data-modifying CTE must be referenced to be rendered
+        buckets, _, _ = self.session.execute(select(
+            select(func.count()).select_from(changed).scalar_subquery(),
+            select(func.count()).select_from(upserted).scalar_subquery(),
+            select(func.count()).select_from(emptied).scalar_subquery(),
+        )).one()
+        return buckets
+
+    def get_revenue_series(self, owner_id: int, query: RevenueQuerySchema):
+        """
+        Sums an owner's daily_revenue rows per period, hostel and payment method, oldest first.
+        """
+        period = cast(func.date_trunc(query.interval.value, DailyRevenue.day), Date).label("period")
+        statement = (
+            select(period, DailyRevenue.hostel_id, DailyRevenue.payment_method,
+                   func.sum(DailyRevenue.amount).label("amount"),
+                   func.sum(DailyRevenue.payment_count).label("payment_count"))
+            .join(Hostel, Hostel.id == DailyRevenue.hostel_id)
+            .where(Hostel.user_id == owner_id, DailyRevenue.day.between(query.start, query.end))
+        )
+        if query.hostel_id is not None:
+            statement = statement.where(DailyRevenue.hostel_id == query.hostel_id)
+        if query.payment_method is not None:
+            statement = statement.where(DailyRevenue.payment_method == query.payment_method)
+
+        statement = (
+            statement
+            .group_by(period, DailyRevenue.hostel_id, DailyRevenue.payment_method)
+            .order_by(period, DailyRevenue.hostel_id, DailyRevenue.payment_method)
+        )
+        return self.session.execute(statement).all()
@@ -1,8 +1,10 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, select, update
 
 
 from backend.app.models.hostels import Room
+from backend.app.models.images import ImageMetaData
 
 class RoomsRepository:
     def __init__(self, session: Session):
@@ -77,6 +79,29 @@ class RoomsRepository:
             self.session.commit()
             self.session.refresh(room)
 
+    def claim_room_slot(self, room_id: int):
+        """
+        Takes one free place in a room, if there is one, without committing.
+
+        A single conditional UPDATE both checks and bumps the occupancy, so concurrent
+        bookings can never overfill a room; the room row stays locked until the caller
+        commits or rolls back. `availability` is the owner's open/closed flag and is left
+        alone: a closed room takes no bookings, a full one is refused by its occupancy.
+
+        Returns:
+            Row: (`id`, `hostel_id`, `occupancy`, `capacity`) after the update, or None if
+            the room does not exist, is closed or is already full.
+        """
+        occupancy = func.coalesce(Room.occupancy, 0)
+        statement = (
+            update(Room)
+            .where(Room.id == room_id, Room.availability.is_(True), occupancy < Room.capacity)
+            .values(occupancy=occupancy + 1)
+            .returning(Room.id, Room.hostel_id, Room.occupancy, Room.capacity)
+            .execution_options(synchronize_session=False)
+        )
+        return self.session.execute(statement).first()
+
     def get_room_by_id(self, room_id: int) -> Room:
 
         # Fetch the room
@@ -88,3 +113,18 @@ class RoomsRepository:
             room.availability = False
             self.session.commit()
             self.session.refresh(room)
+
+    def get_rooms_version(self, hostel_id: int):
+        # Cheap markers that change whenever a room of this hostel or one of its images changes
+        room_images = (
+            select(func.count(ImageMetaData.id), func.max(ImageMetaData.created_at))
+            .join(Room, Room.id == ImageMetaData.room_id)
+            .where(Room.hostel_id == hostel_id)
+            .correlate(None)
+        )
+        return self.session.query(
+            func.count(Room.id).label("room_count"),
+            func.greatest(func.max(Room.created_at), func.max(Room.updated_at)).label("last_updated_at"),
+            room_images.with_only_columns(func.count(ImageMetaData.id)).scalar_subquery().label("image_count"),
+            room_images.with_only_columns(func.max(ImageMetaData.created_at)).scalar_subquery().label("last_image_at"),
+        ).filter(Room.hostel_id == hostel_id).one()
@@ -1,7 +1,11 @@
+from typing import List
+
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert
 
 from backend.app.models.payments import StripePayment
+from backend.app.models.booking import Booking
 
 
 class TransactionRepository:
@@ -21,3 +25,40 @@ class TransactionRepository:
     def get_transaction_by_id(self, transaction_id: str) -> StripePayment:
         return self.session.query(StripePayment).filter(StripePayment.transaction_id  == transaction_id).first()
 
+    def insert_transactions(self, transactions: List[dict]) -> int:
+        """
+        Inserts many Stripe payments in one statement, skipping payment intents that are already stored.
+
+        Redelivered webhooks are therefore harmless. A booking id that does not exist is
+        dropped rather than failing the whole batch on the foreign key.
+
+        Args:
+            transactions (List[dict]): StripePayment column values, one dict per payment.
+
+        Returns:
+            int: The number of payments actually inserted.
+        """
+        if not transactions:
+            return 0
+
+        booking_ids = {row["booking_id"] for row in transactions if row.get("booking_id") is not None}
+        if booking_ids:
+            known = {
+                booking_id for (booking_id,) in
+                self.session.query(Booking.id).filter(Booking.id.in_(booking_ids)).all()
+            }
+            transactions = [
+                {**row, "booking_id": None} if row.get("booking_id") not in known else row
+                for row in transactions
+            ]
+
+        statement = insert(StripePayment).values(transactions).on_conflict_do_nothing(
+            index_elements=[StripePayment.payment_intent_id]
+        )
+        try:
+            result = self.session.execute(statement)
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            raise
+        return result.rowcount
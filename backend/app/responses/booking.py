@@ -28,6 +28,7 @@ class BookingResponseSchema(BaseModel):
     # Timestamps
     created_at: datetime
     updated_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None  # End of the hold on the room while the booking is unpaid
 
 class HostelBookingSchema(BaseModel):
     hostel_id: int
@@ -36,3 +37,4 @@ class HostelBookingSchema(BaseModel):
 
 class BookingsByHostelResponse(BaseModel):
     hostels: List[HostelBookingSchema]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
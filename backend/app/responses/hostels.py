@@ -1,6 +1,6 @@
 from pydantic import BaseModel, constr, conint, HttpUrl
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date
 from backend.app.responses.booking import BookingResponseSchema
 
 
@@ -21,6 +21,8 @@ class HostelResponse(BaseModel):
     rules_and_regulations: List[str]
     amenities: Optional[str] = None
     image_url: List[Images]
+    room_count: Optional[int] = None
+    min_room_price: Optional[float] = None
     created_at: datetime  # Use datetime for proper date handling
     updated_at: Optional[datetime] = None  # Use datetime for proper date handling
 
@@ -29,15 +31,85 @@ class HostelListResponse(BaseModel):
     Pydantic model for returning a list of hostels in API responses.
     """
     hostels: List[HostelResponse]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
 
-class HostelSearchResponse(BaseModel):
+class HostelSearchResponse(HostelListResponse):
     """
     Pydantic model for returning hostel search results
     """
-    results: List[HostelResponse]
+    total_estimate: int  # Exact up to the search count cap, the cap itself beyond that
+
+class HostelSuggestion(BaseModel):
+    """
+    Compact hostel entry for typeahead suggestions.
+    """
+    id: int
+    name: str
+
+class HostelSuggestionListResponse(BaseModel):
+    suggestions: List[HostelSuggestion]
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class HostelFacets(BaseModel):
+    """
+    Number of matching hostels per location, price range and amenity.
+    """
+    locations: List[FacetCount]
+    price_ranges: List[FacetCount]
+    amenities: List[FacetCount]
+
+class HostelFilterResponse(HostelListResponse):
+    """
+    Pydantic model for returning filtered hostels along with their facet counts
+    """
+    facets: HostelFacets
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+
+class HostelCacheStatsResponse(BaseModel):
+    hostel_detail: CacheStats
+    suggestions: CacheStats
+
+class HostelStatsResponse(BaseModel):
+    """
+    Running booking, revenue and room totals of one hostel.
+    """
+    hostel_id: int
+    pending_bookings: int = 0
+    confirmed_bookings: int = 0
+    cancelled_bookings: int = 0
+    booking_revenue: float = 0
+    amount_paid: float = 0
+    room_count: int = 0
+    capacity: int = 0
+    occupancy: int = 0
 
 class HostelDashboard(BaseModel):
     hostels: List[HostelResponse]
     bookings: List[BookingResponseSchema]
+    stats: List[HostelStatsResponse] = []
     total_revenue: str
     total_rooms: str
+
+class RevenuePoint(BaseModel):
+    period: date  # First day of the day, week or month
+    hostel_id: int
+    payment_method: str
+    amount: float
+    payment_count: int
+
+class RevenueAnalyticsResponse(BaseModel):
+    start: date
+    end: date
+    interval: str
+    series: List[RevenuePoint]
+    total_amount: float
+    total_payments: int
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, status, Query, Header, HTTPException
 from fastapi import BackgroundTasks
 
 from backend.app.repository.booking import BookingRepository
@@ -7,6 +7,8 @@ from backend.app.repository.receipt import ReceiptRepository
 from backend.app.repository.hostels import HostelRepository
 from backend.app.repository.payments import PaymentRepository
 from backend.app.repository.transactions import TransactionRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.idempotency import IdempotencyRepository
 
 from backend.app.services.payments import PaymentService
 from backend.app.schemas.payments import *
@@ -16,15 +18,24 @@ from backend.app.responses.booking import *
 from backend.app.schemas.booking import *
 
 from backend.app.core.security import Security
+from backend.app.core.config import get_settings
 from backend.app.database.database import get_session
+from backend.app.utils.admission import AdmissionQueue, AdmissionQueueFull
 
 from backend.app.services.receipts import ReceiptService
+from backend.app.services.idempotency import IdempotencyService
 
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 
 from sqlalchemy.orm import Session
 
 security = Security()
+settings = get_settings()
+
+# Serializes bookings per room so a rush on one room cannot drain the connection pool
+booking_admission_queue = AdmissionQueue(max_depth=settings.BOOKING_ADMISSION_QUEUE_DEPTH,
+                                         max_wait=settings.BOOKING_ADMISSION_MAX_WAIT)
 
 booking_user_router = APIRouter(
     prefix="/booking",
@@ -44,11 +55,27 @@ def get_booking_service(session: Session = Depends(get_session)) -> BookingServi
     booking_repository = BookingRepository(session)
     room_repository = RoomsRepository(session)
     hostel_repository = HostelRepository(session)
-    return BookingService(booking_repository, room_repository, hostel_repository)
+    hostel_stats_repository = HostelStatsRepository(session)
+    return BookingService(booking_repository, room_repository, hostel_repository, hostel_stats_repository)
+
+def get_idempotency_service(session: Session = Depends(get_session)) -> IdempotencyService:
+    idempotency_repository = IdempotencyRepository(session)
+    return IdempotencyService(idempotency_repository)
 
 @booking_user_router.post("/create", status_code=status.HTTP_201_CREATED)
-async def create_booking(data: BookingCreateSchema, booking_service: BookingService = Depends(get_booking_service)):
-    return await booking_service.create_booking(data)
+async def create_booking(data: BookingCreateSchema, idempotency_key: Optional[str] = Header(None),
+                         booking_service: BookingService = Depends(get_booking_service),
+                         idempotency_service: IdempotencyService = Depends(get_idempotency_service)):
+    async def admit_booking():
+        try:
+            async with booking_admission_queue.admit(data.room_id):
+                return await booking_service.create_booking(data)
+        except AdmissionQueueFull as e:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                detail="This room is receiving too many bookings, please retry shortly.",
+                                headers={"Retry-After": str(e.retry_after)})
+
+    return await idempotency_service.run("booking.create", idempotency_key, data, admit_booking)
 
 
 def get_receipt_service(session: Session = Depends(get_session)) -> ReceiptService:
@@ -67,17 +94,36 @@ def get_payment_service(session: Session = Depends(get_session)) -> PaymentServi
     hostel_repository = HostelRepository(session)
     transaction_repository = TransactionRepository(session)
     receipt_repository = ReceiptRepository(session)
+    hostel_stats_repository = HostelStatsRepository(session)
 
-    return PaymentService(payment_repository, booking_repository, room_repository, transaction_repository, hostel_repository, receipt_repository)
+    return PaymentService(payment_repository, booking_repository, room_repository, transaction_repository, hostel_repository, receipt_repository, hostel_stats_repository)
 
 
 @booking_user_router.post("/payment", status_code=status.HTTP_200_OK)
-async def make_payment(data: PaymentCreate, background_tasks: BackgroundTasks,payment_service: PaymentService = Depends(get_payment_service)):
-    return await payment_service.create_payment(data, background_tasks)
+async def make_payment(data: PaymentCreate, background_tasks: BackgroundTasks, idempotency_key: Optional[str] = Header(None),
+                       payment_service: PaymentService = Depends(get_payment_service),
+                       idempotency_service: IdempotencyService = Depends(get_idempotency_service)):
+    return await idempotency_service.run("booking.payment", idempotency_key, data,
+                                         lambda: payment_service.create_payment(data, background_tasks))
 
 
 ################################# Owner routes
 @booking_router.get("/bookings", status_code=status.HTTP_200_OK, response_model=BookingsByHostelResponse)
-async def get_all_my_bookings(current_user = Depends(security.get_current_user),
+async def get_all_my_bookings(booking_status: Optional[BookingStatus] = Query(None, alias="status"),
+                              created_from: Optional[datetime] = None,
+                              created_to: Optional[datetime] = None,
+                              limit: int = Query(50, ge=1, le=200), cursor: Optional[str] = None,
+                              current_user = Depends(security.get_current_user),
                               booking_service: BookingService = Depends(get_booking_service)):
-    return await booking_service.get_all_room_booking_for_one_owner(current_user)
\ No newline at end of file
+    filters = BookingFilterSchema(status=booking_status, created_from=created_from, created_to=created_to)
+    return await booking_service.get_all_room_booking_for_one_owner(current_user, filters, limit, cursor)
+
+
+@booking_router.get("/bookings/export", status_code=status.HTTP_200_OK)
+async def export_my_bookings(export_format: BookingExportFormat = Query(BookingExportFormat.CSV, alias="format"),
+                             booking_status: Optional[BookingStatus] = Query(None, alias="status"),
+                             created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                             current_user = Depends(security.get_current_user),
+                             booking_service: BookingService = Depends(get_booking_service)):
+    filters = BookingFilterSchema(status=booking_status, created_from=created_from, created_to=created_to)
+    return await booking_service.export_bookings_for_one_owner(current_user, filters, export_format)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, Form, File, UploadFile
+from fastapi import APIRouter, Depends, status, Form, File, UploadFile, Query, Header, Response
 
 from backend.app.schemas.hostels import *
 from backend.app.responses.hostels import *
@@ -9,6 +9,9 @@ from backend.app.database.database import get_session
 from backend.app.core.security import Security
 from backend.app.repository.booking import BookingRepository
 from backend.app.repository.rooms import RoomsRepository
+from backend.app.repository.hostel_card import HostelCardRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.revenue import RevenueRepository
 
 
 from sqlalchemy.orm import Session
@@ -34,7 +37,11 @@ def get_hostel_service(session: Session = Depends(get_session)) -> HostelService
     image_repository = ImageMetaDataRepository(session)
     booking_repository = BookingRepository(session)
     room_repository = RoomsRepository(session)
-    return HostelService(hostel_repository, image_repository, booking_repository, room_repository)
+    hostel_card_repository = HostelCardRepository(session)
+    hostel_stats_repository = HostelStatsRepository(session)
+    revenue_repository = RevenueRepository(session)
+    return HostelService(hostel_repository, image_repository, booking_repository, room_repository,
+                         hostel_card_repository, hostel_stats_repository, revenue_repository)
 
 @hostel_router.post("/create", status_code=status.HTTP_201_CREATED)
 async def create_hostel(name: str = Form(), location: str = Form(...),average_price:int = Form(),
@@ -66,9 +73,10 @@ async def delete_hostel(hostel_id: int, hostel_service: HostelService = Depends(
     return await hostel_service.delete_hostel(hostel_id, current_user)
 
 @hostel_router.get("/my-hostels", status_code=status.HTTP_200_OK, response_model=HostelListResponse)
-async def get_all_my_hostels(hostel_service: HostelService = Depends(get_hostel_service),
+async def get_all_my_hostels(limit: int = Query(10, ge=1, le=100), cursor: Optional[str] = None,
+                             hostel_service: HostelService = Depends(get_hostel_service),
                              current_user = Depends(security.get_current_user)):
-    return await hostel_service.get_all_my_hostels(current_user)
+    return await hostel_service.get_all_my_hostels(current_user, limit, cursor)
 
 @hostel_router.get("/hostel-detail", status_code=status.HTTP_200_OK, response_model=HostelResponse)
 async def get_hostel_detail(hostel_id: int, hostel_service: HostelService = Depends(get_hostel_service),
@@ -80,16 +88,57 @@ async def get_hostel_dashboard(current_user = Depends(security.get_current_user)
                                hostel_service: HostelService = Depends(get_hostel_service)):
     return await hostel_service.get_hostel_owner_dashboard(current_user)
 
+@hostel_router.get("/analytics/revenue", status_code=status.HTTP_200_OK, response_model=RevenueAnalyticsResponse)
+async def get_revenue_analytics(start: date, end: date, interval: RevenueInterval = RevenueInterval.DAY,
+                                hostel_id: Optional[int] = None,
+                                payment_method: Optional[str] = Query(None, max_length=100),
+                                current_user = Depends(security.get_current_user),
+                                hostel_service: HostelService = Depends(get_hostel_service)):
+    query = RevenueQuerySchema(start=start, end=end, interval=interval, hostel_id=hostel_id,
+                               payment_method=payment_method)
+    return await hostel_service.get_revenue_analytics(current_user, query)
+
+@hostel_router.get("/cache-stats", status_code=status.HTTP_200_OK, response_model=HostelCacheStatsResponse)
+async def get_cache_stats(current_user = Depends(security.get_current_user),
+                          hostel_service: HostelService = Depends(get_hostel_service)):
+    return await hostel_service.get_cache_stats(current_user)
+
 ################### Student endpoints
 
 @hostel_user_router.get("/all-hostels", status_code=status.HTTP_200_OK, response_model=HostelListResponse)
-async def get_all_hostels(hostel_service: HostelService = Depends(get_hostel_service)):
-    return await hostel_service.get_all_hostels()
+async def get_all_hostels(response: Response, limit: int = Query(10, ge=1, le=100), cursor: Optional[str] = None,
+                          if_none_match: Optional[str] = Header(None),
+                          hostel_service: HostelService = Depends(get_hostel_service)):
+    return await hostel_service.get_all_hostels(limit, cursor, response, if_none_match)
 
-@hostel_user_router.put("/search", status_code=status.HTTP_200_OK, response_model=HostelListResponse)
+@hostel_user_router.put("/search", status_code=status.HTTP_200_OK, response_model=HostelSearchResponse)
 async def search_hostels(query:HostelSearchSchema, hostel_service: HostelService = Depends(get_hostel_service)):
     return await hostel_service.search_hostels(query)
 
+@hostel_user_router.get("/suggest", status_code=status.HTTP_200_OK, response_model=HostelSuggestionListResponse)
+async def suggest_hostels(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(5, ge=1, le=20),
+                          hostel_service: HostelService = Depends(get_hostel_service)):
+    return await hostel_service.suggest_hostels(q, limit)
+
+@hostel_user_router.get("/filter", status_code=status.HTTP_200_OK, response_model=HostelFilterResponse)
+async def filter_hostels(min_price: Optional[int] = Query(None, ge=0), max_price: Optional[int] = Query(None, ge=0),
+                         min_available_rooms: Optional[int] = Query(None, ge=0),
+                         max_available_rooms: Optional[int] = Query(None, ge=0),
+                         location: Optional[str] = Query(None, max_length=255),
+                         amenities: List[AmenityFilter] = Query([]),
+                         limit: int = Query(10, ge=1, le=100), cursor: Optional[str] = None,
+                         hostel_service: HostelService = Depends(get_hostel_service)):
+    filters = HostelFilterSchema(
+        min_price=min_price,
+        max_price=max_price,
+        min_available_rooms=min_available_rooms,
+        max_available_rooms=max_available_rooms,
+        location=location,
+        amenities=amenities
+    )
+
+    return await hostel_service.filter_hostels(filters, limit, cursor)
+
 @hostel_user_router.get("/hostel-detail-student", status_code=status.HTTP_200_OK, response_model=HostelResponse)
 async def get_hostel_detail_student(hostel_id: int, hostel_service: HostelService = Depends(get_hostel_service)):
     return await hostel_service.get_hostel_detail_user(hostel_id)
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, status, Form, UploadFile,File
+from fastapi import APIRouter, Depends, status, Form, UploadFile,File, Header, Response
+from typing import Optional
 
 from backend.app.services.rooms import RoomService
 from backend.app.repository.rooms import RoomsRepository
@@ -6,6 +7,8 @@ from backend.app.schemas.rooms import *
 from backend.app.responses.rooms import *
 from backend.app.repository.images import ImageMetaDataRepository
 from backend.app.repository.hostels import HostelRepository
+from backend.app.repository.hostel_card import HostelCardRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
 
 from backend.app.core.security import Security
 from backend.app.database.database import get_session
@@ -31,7 +34,10 @@ def get_rooms_service(session: Session = Depends(get_session)) -> RoomService:
     room_repository = RoomsRepository(session)
     hostel_repository = HostelRepository(session)
     image_metadata_repository = ImageMetaDataRepository(session)
-    return RoomService(room_repository,hostel_repository,image_metadata_repository)
+    hostel_card_repository = HostelCardRepository(session)
+    hostel_stats_repository = HostelStatsRepository(session)
+    return RoomService(room_repository,hostel_repository,image_metadata_repository, hostel_card_repository,
+                       hostel_stats_repository)
 
 @room_router.post("/create", status_code=status.HTTP_201_CREATED, response_model=RoomResponse)
 async def create_room(hostel_id: int = Form(), room_number: str = Form(...),room_type: RoomType = Form(),
@@ -72,8 +78,9 @@ async def get_single_room_detail(hostel_id: int, room_number: str, current_user
 ################################# student endpoints
 
 @room_user_router.get("/get-all-rooms", status_code=status.HTTP_200_OK, response_model=AllRoomsResponse)
-async def get_all_rooms_in_a_hostel(hostel_id: int, room_service: RoomService = Depends(get_rooms_service)):
-    return await room_service.get_all_rooms_by_hostel_id(hostel_id)
+async def get_all_rooms_in_a_hostel(hostel_id: int, response: Response, if_none_match: Optional[str] = Header(None),
+                                    room_service: RoomService = Depends(get_rooms_service)):
+    return await room_service.get_all_rooms_by_hostel_id(hostel_id, response, if_none_match)
 
 @room_user_router.get("/get-single-room", status_code=status.HTTP_200_OK, response_model=RoomResponse)
 async def get_single_room_detail(hostel_id: int, room_number: str, room_service: RoomService = Depends(get_rooms_service)):
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Request, Header, status
+from typing import Optional
+
+from backend.app.services.transactions import receive_stripe_webhook
+
+transaction_router = APIRouter(
+    prefix="/transactions",
+    tags=["Transactions"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@transaction_router.post("/stripe/webhook", status_code=status.HTTP_200_OK)
+async def stripe_webhook(request: Request, stripe_signature: Optional[str] = Header(None)):
+    # The signature covers the raw body, so it is read as bytes rather than parsed by FastAPI
+    payload = await request.body()
+    return await receive_stripe_webhook(payload, stripe_signature)
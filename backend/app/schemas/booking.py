@@ -27,3 +27,16 @@ class BookingCreateSchema(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+
+class BookingFilterSchema(BaseModel):
+    """
+    Pydantic model for filtering a custodian's bookings
+    """
+    status: Optional[BookingStatus] = None
+    created_from: Optional[datetime] = None  # Inclusive
+    created_to: Optional[datetime] = None  # Exclusive
+
+
+class BookingExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, constr, conint
-from typing import Optional
+from typing import Optional, List
+from datetime import date
+import enum
 
 class HostelCreateSchema(BaseModel):
     """
@@ -23,4 +25,38 @@ class HostelSearchSchema(BaseModel):
     """
     Pydantic model for searching a hostel
     """
-    query: constr(max_length=255, min_length=1)
\ No newline at end of file
+    query: constr(max_length=255, min_length=1)
+    limit: conint(ge=1, le=100) = 10
+    cursor: Optional[str] = None  # `next_cursor` from the previous page
+
+
+# One amenity to filter on, also declared on the filter endpoint's query parameter
+AmenityFilter = constr(min_length=1, max_length=100)
+
+
+class HostelFilterSchema(BaseModel):
+    """
+    Pydantic model for filtering hostels
+    """
+    min_price: Optional[conint(ge=0)] = None
+    max_price: Optional[conint(ge=0)] = None
+    min_available_rooms: Optional[conint(ge=0)] = None
+    max_available_rooms: Optional[conint(ge=0)] = None
+    location: Optional[constr(max_length=255)] = None
+    amenities: List[AmenityFilter] = []  # Hostel must offer all of these
+
+
+class RevenueInterval(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class RevenueQuerySchema(BaseModel):
+    """
+    Pydantic model for querying an owner's revenue over time
+    """
+    start: date
+    end: date  # Inclusive
+    interval: RevenueInterval = RevenueInterval.DAY
+    hostel_id: Optional[int] = None
+    payment_method: Optional[constr(max_length=100)] = None
@@ -2,6 +2,7 @@ import enum
 
 from pydantic import BaseModel, EmailStr, constr
 from datetime import datetime
+from typing import Optional
 
 class ReceiptContext(BaseModel):
     # Receipt Information
@@ -19,18 +20,19 @@ class ReceiptContext(BaseModel):
     student_email: str
     student_phone: str
     student_university: str
-    student_course: str
-    student_study_year: str
+    # Not collected when booking, left out of the receipt when missing
+    student_course: Optional[str] = None
+    student_study_year: Optional[str] = None
 
     # Home Residence
-    home_address: str
-    home_district: str
-    home_country: str
+    home_address: Optional[str] = None
+    home_district: Optional[str] = None
+    home_country: Optional[str] = None
 
     # Next of Kin
-    next_of_kin_name: str
-    next_of_kin_phone: str
-    kin_relationship: str
+    next_of_kin_name: Optional[str] = None
+    next_of_kin_phone: Optional[str] = None
+    kin_relationship: Optional[str] = None
 
     # Pricing
     room_price_per_semester: float
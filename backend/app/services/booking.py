@@ -1,8 +1,13 @@
 from fastapi import HTTPException, status
 
-from typing import List
+from typing import Iterable, Iterator, List, Optional
+from datetime import timedelta
+import csv
+import io
+import json
+import logging
 
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
 from backend.app.repository.booking import BookingRepository
 from backend.app.models.booking import Booking
@@ -11,15 +16,62 @@ from backend.app.schemas.booking import *
 
 from backend.app.repository.rooms import RoomsRepository
 from backend.app.repository.hostels import HostelRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
 from backend.app.models.users import User, UserRole
+from backend.app.utils.pagination import decode_cursor, build_page
+from backend.app.database.database import SessionLocal
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Columns of a booking export, in order
+EXPORT_COLUMNS = ["id", "hostel_id", "hostel_name", "room_id", "first_name", "last_name", "email_address",
+                  "phone_number", "university", "status", "created_at", "updated_at", "expires_at"]
+# Rows written per chunk of a streamed export
+EXPORT_CHUNK_ROWS = 500
+
+
+def _export_record(row) -> dict:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record["status"] = row.status.value if row.status is not None else None
+    record["created_at"] = row.created_at.isoformat() if row.created_at else None
+    record["updated_at"] = row.updated_at.isoformat() if row.updated_at else None
+    record["expires_at"] = row.expires_at.isoformat() if row.expires_at else None
+    return record
+
+
+def _csv_chunks(rows: Iterable) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(_export_record(row))
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows: Iterable) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(_export_record(row)))
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
 
 
 class BookingService:
     def __init__(self, booking_repository: BookingRepository, room_repository: RoomsRepository,
-                  hostel_repository: HostelRepository):
+                  hostel_repository: HostelRepository, hostel_stats_repository: HostelStatsRepository):
         self.booking_repository = booking_repository
         self.room_repository = room_repository
         self.hostel_repository = hostel_repository
+        self.hostel_stats_repository = hostel_stats_repository
 
 # working +
     async def create_booking(self, data: BookingCreateSchema):
@@ -29,17 +81,21 @@ class BookingService:
         if not data.hostel_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Hostel id can not be null")
 
-        room_occupancy = self.room_repository.get_room_occupancy_count(data.room_id)
-
-        print(f"Room Occupancy:{room_occupancy}")
-
-        room_capacity = self.room_repository.get_room_capacity_count(data.room_id)
-        print(f"Room Capacity: {room_capacity}")
-
-        if room_occupancy >= room_capacity:
-            # update room availability
-            self.room_repository.update_room_availability_status(data.room_id)
+        # Admission is one transaction: claim a place in the room, then insert the booking
+        # and update the hostel stats, all committed together by create_booking
+        room_slot = self.room_repository.claim_room_slot(data.room_id)
+        if room_slot is None:
+            self.booking_repository.session.rollback()
+            room = self.room_repository.get_room_by_id(data.room_id)
+            if not room:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room with this id does not exist.")
+            if (room.occupancy or 0) < room.capacity:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Room is not available for booking")
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Room is already full")
+        if room_slot.hostel_id != data.hostel_id:
+            # The place was claimed in the room's own hostel, give it back
+            self.booking_repository.session.rollback()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Room does not belong to this hostel.")
 
         booking = Booking(
             first_name=data.first_name,
@@ -47,24 +103,36 @@ class BookingService:
             email_address=data.email_address,
             phone_number=data.phone_number,
             university=data.university,
-            hostel_id=data.hostel_id,
-            room_id=data.room_id,
+            hostel_id=room_slot.hostel_id,
+            room_id=room_slot.id,
             status=BookingStatus.PENDING,
             created_at=datetime.now(),
             updated_at=datetime.now(),
+            # The place is only held until then unless the booking gets paid
+            expires_at=datetime.now() + timedelta(seconds=settings.BOOKING_HOLD_TTL),
         )
 
+        self.hostel_stats_repository.record_booking(booking.hostel_id, booking.room_id)
+        self.hostel_stats_repository.increment(booking.hostel_id, occupancy=1)
         self.booking_repository.create_booking(booking)
 
-        # Increment room occupancy count after successful booking
-        self.room_repository.increment_room_occupancy(booking.room_id)
-
         # TODO: Send Email notification for the booking
 
         return JSONResponse("Booking received successfully waiting for approval and payment.")
 
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]):
+        if not cursor:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
 # working +
-    async def get_all_room_booking_for_one_owner(self, current_user: User) -> dict:
+    async def get_all_room_booking_for_one_owner(self, current_user: User, filters: BookingFilterSchema,
+                                                 limit: int = 10, cursor: Optional[str] = None
+                                                 ) -> BookingsByHostelResponse:
         # Authorization check
         if current_user.role != UserRole.HOSTEL_OWNER:
             raise HTTPException(
@@ -72,40 +140,76 @@ class BookingService:
                 detail="User is not authorized to view room bookings"
             )
 
-        # Fetch owned hostels
-        owned_hostels = self.hostel_repository.get_all_hostels_by_one_owner(current_user.id)
-        # if not owned_hostels:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_403_FORBIDDEN,
-        #         detail="User does not own any hostels."
-        #     )
-
-        result = {"hostels": []}
-
-        for hostel in owned_hostels:
-            bookings = self.booking_repository.get_all_room_booking_by_hostel_id(hostel.id)
-
-            booking_list = [
-                BookingResponseSchema(
-                    id=booking.id,
-                    first_name=booking.first_name,
-                    last_name=booking.last_name,
-                    email_address=booking.email_address,
-                    phone_number=booking.phone_number,
-                    university=booking.university,
+        # One page of bookings across all owned hostels, one extra row tells us if there is a next page
+        rows = self.booking_repository.get_bookings_for_owner(current_user.id, filters, limit=limit + 1,
+                                                              after=self._decode_cursor(cursor))
+        bookings, next_cursor = build_page(rows, limit)
+
+        # Group the page by hostel, in the order each hostel first appears
+        hostels = {}
+        for booking in bookings:
+            if booking.hostel_id not in hostels:
+                hostels[booking.hostel_id] = HostelBookingSchema(
                     hostel_id=booking.hostel_id,
-                    room_id=booking.room_id,
-                    status=booking.status,
-                    created_at=booking.created_at,
-                    updated_at=booking.updated_at,
+                    hostel_name=booking.hostel.name,
+                    bookings=[]
                 )
-                for booking in bookings
-            ]
 
-            result["hostels"].append({
-                "hostel_id": hostel.id,
-                "hostel_name": hostel.name,
-                "bookings": booking_list
-            })
+            hostels[booking.hostel_id].bookings.append(BookingResponseSchema(
+                id=booking.id,
+                first_name=booking.first_name,
+                last_name=booking.last_name,
+                email_address=booking.email_address,
+                phone_number=booking.phone_number,
+                university=booking.university,
+                hostel_id=booking.hostel_id,
+                room_id=booking.room_id,
+                status=booking.status,
+                created_at=booking.created_at,
+                updated_at=booking.updated_at,
+                expires_at=booking.expires_at,
+            ))
+
+        return BookingsByHostelResponse(hostels=list(hostels.values()), next_cursor=next_cursor)
+
+    async def export_bookings_for_one_owner(self, current_user: User, filters: BookingFilterSchema,
+                                            export_format: BookingExportFormat) -> StreamingResponse:
+        # Authorization check
+        if current_user.role != UserRole.HOSTEL_OWNER:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User is not authorized to export room bookings"
+            )
 
-        return result
\ No newline at end of file
+        # Rows go straight from the database cursor to the client in fixed size chunks
+        rows = self.booking_repository.stream_bookings_for_owner(current_user.id, filters)
+        if export_format == BookingExportFormat.NDJSON:
+            content, media_type = _ndjson_chunks(rows), "application/x-ndjson"
+        else:
+            content, media_type = _csv_chunks(rows), "text/csv"
+
+        filename = f"bookings.{export_format.value}"
+        return StreamingResponse(content, media_type=media_type,
+                                 headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+# Bookings released per statement by the hold sweeper
+HOLD_SWEEP_BATCH_SIZE = 500
+
+
+def sweep_expired_booking_holds():
+    """
+    Releases every expired booking hold, a batch at a time.
+    """
+    released = 0
+    now = datetime.now()
+    with SessionLocal() as session:
+        repository = BookingRepository(session)
+        while True:
+            batch = repository.release_expired_holds(now, HOLD_SWEEP_BATCH_SIZE)
+            released += batch
+            if batch < HOLD_SWEEP_BATCH_SIZE:
+                break
+
+    if released:
+        logger.info(f"Expired booking holds released: {released}")
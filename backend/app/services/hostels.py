@@ -1,7 +1,10 @@
-from fastapi import HTTPException, status, UploadFile
+from fastapi import HTTPException, status, UploadFile, Response
 from fastapi.responses import JSONResponse
 
-from backend.app.models.hostels import Hostel
+import logging
+from datetime import timedelta
+
+from backend.app.models.hostels import Hostel, normalize_amenities, parse_rules
 from backend.app.models.users import User,UserRole
 from backend.app.repository.hostels import HostelRepository
 from backend.app.schemas.hostels import *
@@ -15,18 +18,81 @@ from backend.app.repository.images import ImageMetaDataRepository
 from backend.app.repository.booking import BookingRepository
 from backend.app.responses.booking import BookingResponseSchema
 from backend.app.repository.rooms import RoomsRepository
+from backend.app.repository.hostel_card import HostelCardRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.revenue import RevenueRepository
+from backend.app.models.hostel_card import HostelCard
+from backend.app.utils.pagination import decode_cursor, decode_rank_cursor, encode_rank_cursor, build_page
+from backend.app.utils.cache import LRUCache
+from backend.app.utils.etag import make_etag, etag_matches
+from backend.app.database.database import SessionLocal
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Search results past this many are reported as this many
+SEARCH_COUNT_CAP = 1000
+
+# Lower bounds of the price ranges reported in the filter facets
+PRICE_FACET_BOUNDARIES = [250000, 500000, 750000, 1000000, 1500000]
+
+# Hot typeahead prefixes, shared by every request handled by this process
+suggestion_cache = LRUCache(max_size=1024, ttl=60)
+
+# Checkpoint name of the daily revenue rollup, and how far back each run re-reads payment
+# changes to catch transactions that committed after the previous run
+REVENUE_ROLLUP_CHECKPOINT = "daily_revenue"
+REVENUE_ROLLUP_OVERLAP = timedelta(minutes=5)
+
+# Public hostel detail responses by hostel_id, invalidated whenever the hostel or its images change
+hostel_detail_cache = LRUCache(max_size=settings.HOSTEL_DETAIL_CACHE_SIZE, ttl=settings.HOSTEL_DETAIL_CACHE_TTL)
 
 
 class HostelService:
     def __init__(self, hostel_repository: HostelRepository, image_repository: ImageMetaDataRepository,
-                 booking_repository: BookingRepository, room_repository: RoomsRepository):
+                 booking_repository: BookingRepository, room_repository: RoomsRepository,
+                 hostel_card_repository: HostelCardRepository, hostel_stats_repository: HostelStatsRepository,
+                 revenue_repository: RevenueRepository):
         self.hostel_repository = hostel_repository
         self.image_repository = image_repository
         self.booking_repository = booking_repository
         self.room_repository = room_repository
+        self.hostel_card_repository = hostel_card_repository
+        self.hostel_stats_repository = hostel_stats_repository
+        self.revenue_repository = revenue_repository
+
+    @staticmethod
+    def _card_to_response(card: HostelCard, description: Optional[str] = None) -> HostelResponse:
+        # Everything comes from the precomputed card, only the image URLs are signed (from cache)
+        return HostelResponse(
+            id=card.hostel_id,
+            name=card.name,
+            image_url=[
+                Images(url=generate_presigned_url(image["bucket_name"], image["object_name"],
+                                                  version_id=image.get("version_id")))
+                for image in card.images
+            ],
+            description=description or card.description,
+            location=card.location,
+            owner_id=card.owner_id,
+            average_price=card.average_price,
+            available_rooms=card.available_rooms,
+            amenities=card.amenities,
+            rules_and_regulations=card.rules,
+            room_count=card.room_count,
+            min_room_price=card.min_room_price,
+            created_at=card.created_at,
+            updated_at=card.updated_at,
+        )
 
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]):
+        if not cursor:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
 
 # working +
     async def create_hostel(self, images: List[UploadFile], data: HostelCreateSchema, current_user: User):
@@ -49,10 +115,15 @@ class HostelService:
             user_id=current_user.id,
             available_rooms=data.available_rooms,
             rules_and_regulations=data.rules_and_regulations,
+            rules=parse_rules(data.rules_and_regulations),
             amenities=data.amenities,
+            amenity_tags=normalize_amenities((data.amenities or "").split(",")),
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
+        # The hostel and its listing card are committed together, so it is listed even if no image gets saved
+        self.hostel_repository.add_hostel(hostel)
+        self.hostel_card_repository.refresh_hostel_card(hostel.id, commit=False)
         hostel = self.hostel_repository.create_hostel(hostel)
 
 
@@ -61,26 +132,31 @@ class HostelService:
         if not images:
             raise HTTPException(status_code=400, detail="No files uploaded.")
 
-        for file in images:
-            object_name = f"H{hostel.id}/{uuid4().hex}_{file.filename}"
+        try:
+            for file in images:
+                object_name = f"H{hostel.id}/{uuid4().hex}_{file.filename}"
 
-            meta = await upload_image_file_to_minio(bucket_name, object_name, file)
+                meta = await upload_image_file_to_minio(bucket_name, object_name, file)
 
-            image = ImageMetaData(
-                file_name=meta["file_name"],
-                bucket_name=meta["bucket_name"],
-                object_name=meta["object_name"],
-                etag=meta["etag"],
-                version_id=meta.get("version_id"),
-                hostel_id=hostel.id
-            )
+                image = ImageMetaData(
+                    file_name=meta["file_name"],
+                    bucket_name=meta["bucket_name"],
+                    object_name=meta["object_name"],
+                    etag=meta["etag"],
+                    version_id=meta.get("version_id"),
+                    hostel_id=hostel.id
+                )
 
-            self.image_repository.create_image_metadata(image)
+                self.image_repository.create_image_metadata(image)
 
-            uploaded.append({
-                "id": image.id,
-                "file_name": image.file_name
-            })
+                uploaded.append({
+                    "id": image.id,
+                    "file_name": image.file_name
+                })
+        finally:
+            # The card lists the images saved so far, even if a later upload failed
+            self.hostel_card_repository.refresh_hostel_card(hostel.id)
+            hostel_detail_cache.invalidate(hostel.id)
 
         image_count = len(uploaded)
 
@@ -106,6 +182,10 @@ class HostelService:
             hostel.location = data.location
         if data.amenities:
             hostel.amenities = data.amenities
+            hostel.amenity_tags = normalize_amenities(data.amenities.split(","))
+        if data.rules_and_regulations:
+            hostel.rules_and_regulations = data.rules_and_regulations
+            hostel.rules = parse_rules(data.rules_and_regulations)
         if data.available_rooms is not None:  # Check if available_rooms is explicitly set
             hostel.available_rooms = data.available_rooms
         if data.average_price:
@@ -115,7 +195,10 @@ class HostelService:
         if data.image_url:
             hostel.image_url = data.image_url
 
+        # Committed together with the refreshed listing card
+        self.hostel_card_repository.refresh_hostel_card(hostel.id, commit=False)
         self.hostel_repository.update_hostel(hostel)
+        hostel_detail_cache.invalidate(hostel.id)
 
         return HostelResponse(
             id=hostel.id,
@@ -145,27 +228,36 @@ class HostelService:
         if not hostel_to_delete:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Hostel does not exists")
 
+        # Committed together with the removal of the listing card
+        self.hostel_card_repository.delete_hostel_card(hostel_to_delete.id, commit=False)
         self.hostel_repository.delete_hostel(hostel_to_delete)
+        hostel_detail_cache.invalidate(hostel_to_delete.id)
 
         return JSONResponse("Hostel deleted successfully.")
 
 # working +
-    async def get_all_my_hostels(self, current_user: User) -> HostelListResponse:
+    async def get_all_my_hostels(self, current_user: User, limit: int = 10,
+                                 cursor: Optional[str] = None) -> HostelListResponse:
 
         # Authorization check
         if not current_user.role == UserRole.HOSTEL_OWNER:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not authorized to create a room")
 
-        # get the hostels by owner id
-        hostels = self.hostel_repository.get_all_hostels_by_one_owner(current_user.id)
+        # get one page of hostels by owner id, one extra row tells us if there is a next page
+        rows = self.hostel_repository.get_all_hostels_by_one_owner(current_user.id, limit=limit + 1,
+                                                                   after=self._decode_cursor(cursor))
+        hostels, next_cursor = build_page(rows, limit)
         # if not hostels:
         #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,  detail="Hostel by this owner does not exists.")
 
         hostel_list = []
 
+        # Load every hostel's image metadata in one query instead of one per hostel
+        images_by_hostel = self.image_repository.get_image_metadata_for_hostels(hostel.id for hostel in hostels)
+
         for hostel in hostels:
-            # Get all this room image metadata from images table
-            images = self.image_repository.get_image_metadata_by_hostel_id(hostel.id)
+            # Get all this hostel image metadata from the preloaded images
+            images = images_by_hostel[hostel.id]
             # if not images:
             #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hostel has no images")
 
@@ -173,7 +265,7 @@ class HostelService:
 
             # Get presigned_url for all the images
             for image in images:
-                url = generate_presigned_url(image.bucket_name, image.object_name)
+                url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
                 image_urls.append({"url": url})
 
             hostel_response = HostelResponse(
@@ -194,74 +286,107 @@ class HostelService:
             hostel_list.append(hostel_response)
 
         # Return a single HostelListResponse with the list of HostelResponse
-        return HostelListResponse(hostels=hostel_list)
+        return HostelListResponse(hostels=hostel_list, next_cursor=next_cursor)
 
 # working +
-    async def get_all_hostels(self) -> HostelListResponse:
+    async def get_all_hostels(self, limit: int = 10, cursor: Optional[str] = None,
+                              response: Optional[Response] = None, if_none_match: Optional[str] = None):
 
+        # Conditional GET: answer from the catalogue version alone when the client is up to date
+        version = self.hostel_card_repository.get_catalogue_version()
+        etag = make_etag("all-hostels", limit, cursor, version.card_count, version.last_refreshed_at)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        if response is not None:
+            response.headers["ETag"] = etag
 
-        hostels =  self.hostel_repository.get_all_hostels()
+        # get one page of hostel cards, one extra row tells us if there is a next page
+        rows = self.hostel_card_repository.get_hostel_cards(limit=limit + 1, after=self._decode_cursor(cursor))
+        cards, next_cursor = build_page(rows, limit, id_attr="hostel_id")
 
-        hostel_list = []
+        hostel_list = [self._card_to_response(card) for card in cards]
 
-        for hostel in hostels:
-            # Get all this room image metadata from images table
-            images = self.image_repository.get_image_metadata_by_hostel_id(hostel.id)
-            # if not images:
-            #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hostel has no images")
+        # Return a single HostelListResponse with the list of HostelResponse
+        return HostelListResponse(hostels=hostel_list, next_cursor=next_cursor)
 
-            image_urls = []
+# working +
+    async def search_hostels(self, search_data: HostelSearchSchema) -> HostelSearchResponse:
+        after = None
+        if search_data.cursor:
+            try:
+                after = decode_rank_cursor(search_data.cursor)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+        # one extra row tells us if there is a next page
+        results = self.hostel_repository.search_hostels(search_data.query, limit=search_data.limit + 1, after=after)
+
+        missing_cards = [result["hostel_id"] for result in results if result["card"] is None]
+        if missing_cards:
+            # Hostels whose card was never built: build them and read the page again
+            logger.warning(f"Hostels found without a listing card: {missing_cards}")
+            self.hostel_card_repository.refresh_hostel_cards(missing_cards)
+            results = self.hostel_repository.search_hostels(search_data.query, limit=search_data.limit + 1,
+                                                            after=after)
+            # Deleted in the meantime
+            results = [result for result in results if result["card"] is not None]
+
+        if not results and not search_data.cursor:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hostels found for this query")
 
-            # Get presigned_url for all the images
-            for image in images:
-                url = generate_presigned_url(image.bucket_name, image.object_name)
-                image_urls.append({"url": url})
+        next_cursor = None
+        if len(results) > search_data.limit:
+            results = results[:search_data.limit]
+            next_cursor = encode_rank_cursor(results[-1]["rank"], results[-1]["hostel_id"])
 
-            hostel_response = HostelResponse(
-                id=hostel.id,
-                name=hostel.name,
-                image_url=image_urls,
-                description=hostel.description,
-                location=hostel.location,
-                owner_id=hostel.user_id,
-                average_price=hostel.average_price,
-                available_rooms=hostel.available_rooms,
-                amenities=hostel.amenities,
-                rules_and_regulations=hostel.get_rules(),
-                created_at=hostel.created_at,
-                updated_at=hostel.updated_at,
-            )
+        total_estimate = self.hostel_repository.count_search_results(search_data.query, cap=SEARCH_COUNT_CAP)
 
-            hostel_list.append(hostel_response)
+        hostel_list = [
+            self._card_to_response(result["card"], description=result["highlighted_description"])
+            for result in results
+        ]
 
-        # Return a single HostelListResponse with the list of HostelResponse
-        return HostelListResponse(hostels=hostel_list)
+        return HostelSearchResponse(hostels=hostel_list, next_cursor=next_cursor, total_estimate=total_estimate)
 
-# working +
-    async def search_hostels(self, search_data: HostelSearchSchema) -> HostelListResponse:
-        results = self.hostel_repository.search_hostels(search_data.query)
+    async def suggest_hostels(self, query: str, limit: int = 5) -> HostelSuggestionListResponse:
+        normalized_query = " ".join(query.split()).lower()
+        if not normalized_query:
+            return HostelSuggestionListResponse(suggestions=[])
 
-        if not results:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No hostels found for this query")
+        cache_key = (normalized_query, limit)
+        cached = suggestion_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        hostel_list = []
+        rows = self.hostel_repository.suggest_hostels(normalized_query, limit)
+        response = HostelSuggestionListResponse(
+            suggestions=[HostelSuggestion(id=row.id, name=row.name) for row in rows]
+        )
+        suggestion_cache.set(cache_key, response)
+        return response
 
-        for result in results:
-            hostel = result["hostel"]
-            highlighted_description = result.get("highlighted_description", hostel.description)
+    async def filter_hostels(self, filters: HostelFilterSchema, limit: int = 10,
+                             cursor: Optional[str] = None) -> HostelFilterResponse:
+        if filters.min_price is not None and filters.max_price is not None and filters.min_price > filters.max_price:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_price can not exceed max_price.")
 
-            images = self.image_repository.get_image_metadata_by_hostel_id(hostel.id)
+        # get one page of hostels, one extra row tells us if there is a next page
+        rows = self.hostel_repository.filter_hostels(filters, limit=limit + 1, after=self._decode_cursor(cursor))
+        hostels, next_cursor = build_page(rows, limit)
 
-            image_urls = [
-                Images(url=generate_presigned_url(image.bucket_name, image.object_name))
-                for image in images
-            ]
+        # Load every hostel's image metadata in one query instead of one per hostel
+        images_by_hostel = self.image_repository.get_image_metadata_for_hostels(hostel.id for hostel in hostels)
 
-            hostel_response = HostelResponse(
+        hostel_list = [
+            HostelResponse(
                 id=hostel.id,
                 name=hostel.name,
-                image_url=image_urls,
-                description=highlighted_description,
+                image_url=[
+                    Images(url=generate_presigned_url(image.bucket_name, image.object_name,
+                                                      version_id=image.version_id))
+                    for image in images_by_hostel[hostel.id]
+                ],
+                description=hostel.description,
                 location=hostel.location,
                 owner_id=hostel.user_id,
                 average_price=hostel.average_price,
@@ -269,14 +394,37 @@ class HostelService:
                 amenities=hostel.amenities,
                 rules_and_regulations=hostel.get_rules(),
                 created_at=hostel.created_at,
-                updated_at=hostel.updated_at
+                updated_at=hostel.updated_at,
             )
+            for hostel in hostels
+        ]
 
-            hostel_list.append(hostel_response)
+        # All facet counts come back from one aggregate query
+        facets = {"location": [], "price_range": [], "amenity": []}
+        for facet, value, count in self.hostel_repository.get_hostel_facets(filters, PRICE_FACET_BOUNDARIES):
+            facets[facet].append((value, count))
 
-        # TODO: Add pagination support here
+        return HostelFilterResponse(
+            hostels=hostel_list,
+            next_cursor=next_cursor,
+            facets=HostelFacets(
+                locations=[FacetCount(value=value, count=count)
+                           for value, count in sorted(facets["location"], key=lambda item: -item[1])],
+                price_ranges=[FacetCount(value=self._price_range_label(int(bucket)), count=count)
+                              for bucket, count in sorted(facets["price_range"], key=lambda item: int(item[0]))],
+                amenities=[FacetCount(value=value, count=count)
+                           for value, count in sorted(facets["amenity"], key=lambda item: -item[1])],
+            )
+        )
 
-        return HostelListResponse(hostels=hostel_list)
+    @staticmethod
+    def _price_range_label(bucket: int) -> str:
+        # width_bucket: 0 is below the first boundary, len(boundaries) is at or above the last one
+        if bucket == 0:
+            return f"<{PRICE_FACET_BOUNDARIES[0]}"
+        if bucket == len(PRICE_FACET_BOUNDARIES):
+            return f"{PRICE_FACET_BOUNDARIES[-1]}+"
+        return f"{PRICE_FACET_BOUNDARIES[bucket - 1]}-{PRICE_FACET_BOUNDARIES[bucket] - 1}"
 
 # working +
     async def get_hostel_detail(self, hostel_id: int, current_user: User):
@@ -302,7 +450,7 @@ class HostelService:
 
         # Get presigned_url for all the images
         for image in images:
-            url = generate_presigned_url(image.bucket_name, image.object_name)
+            url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
             image_urls.append({"url": url})
 
         # Return the hostel details in the response
@@ -324,6 +472,10 @@ class HostelService:
 # working +
     async def get_hostel_detail_user(self, hostel_id: int):
 
+        cached = hostel_detail_cache.get(hostel_id)
+        if cached is not None:
+            return cached
+
         # Fetch the hostel details by hostel_id
         hostel = self.hostel_repository.get_hostel_by_id(hostel_id)
         if not hostel:
@@ -338,11 +490,11 @@ class HostelService:
 
         # Get presigned_url for all the images
         for image in images:
-            url = generate_presigned_url(image.bucket_name, image.object_name)
+            url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
             image_urls.append({"url": url})
 
         # Return the hostel details in the response
-        return HostelResponse(
+        hostel_response = HostelResponse(
             id=hostel.id,
             name=hostel.name,
             image_url=image_urls,
@@ -356,7 +508,45 @@ class HostelService:
             created_at=hostel.created_at,
             updated_at=hostel.updated_at,
         )
+        hostel_detail_cache.set(hostel_id, hostel_response)
+
+        return hostel_response
+
+
+    async def get_cache_stats(self, current_user: User) -> HostelCacheStatsResponse:
+        # Authorization check
+        if not current_user.role == UserRole.ADMIN:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not authorized to view cache stats")
 
+        return HostelCacheStatsResponse(
+            hostel_detail=CacheStats(**hostel_detail_cache.stats()),
+            suggestions=CacheStats(**suggestion_cache.stats()),
+        )
+
+    async def get_revenue_analytics(self, current_user: User, query: RevenueQuerySchema) -> RevenueAnalyticsResponse:
+        # Authorization check
+        if not current_user.role == UserRole.HOSTEL_OWNER:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not authorized to view revenue")
+
+        if query.start > query.end:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+
+        # Only rollup rows are read, one per day, hostel and payment method at most
+        rows = self.revenue_repository.get_revenue_series(current_user.id, query)
+        series = [
+            RevenuePoint(period=row.period, hostel_id=row.hostel_id, payment_method=row.payment_method,
+                         amount=row.amount, payment_count=row.payment_count)
+            for row in rows
+        ]
+
+        return RevenueAnalyticsResponse(
+            start=query.start,
+            end=query.end,
+            interval=query.interval.value,
+            series=series,
+            total_amount=sum(point.amount for point in series),
+            total_payments=sum(point.payment_count for point in series),
+        )
 
     async def get_hostel_owner_dashboard(self, current_user: User):
         # Authorization check
@@ -367,11 +557,13 @@ class HostelService:
         hostels = self.hostel_repository.get_all_hostels_by_one_owner(current_user.id)
 
         hostel_list = []
-        available_rooms = []
+
+        # Load every hostel's image metadata in one query instead of one per hostel
+        images_by_hostel = self.image_repository.get_image_metadata_for_hostels(hostel.id for hostel in hostels)
 
         for hostel in hostels:
-            # Get all this room image metadata from images table
-            images = self.image_repository.get_image_metadata_by_hostel_id(hostel.id)
+            # Get all this hostel image metadata from the preloaded images
+            images = images_by_hostel[hostel.id]
             # if not images:
             #     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hostel has no images")
 
@@ -379,7 +571,7 @@ class HostelService:
 
             # Get presigned_url for all the images
             for image in images:
-                url = generate_presigned_url(image.bucket_name, image.object_name)
+                url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
                 image_urls.append({"url": url})
 
             hostel_response = HostelResponse(
@@ -397,18 +589,15 @@ class HostelService:
                 updated_at=hostel.updated_at,
             )
 
-            number_of_rooms = hostel.available_rooms
-            available_rooms.append(number_of_rooms)
-
             hostel_list.append(hostel_response)
 
         bookings_list = []
-        room_prices = []
 
-        for hostel in hostels:
-            bookings = self.booking_repository.get_all_room_booking_by_hostel_id(hostel.id)
+        # Load every hostel's bookings in one query instead of one per hostel
+        bookings_by_hostel = self.booking_repository.get_bookings_for_hostels(hostel.id for hostel in hostels)
 
-            for booking in bookings:
+        for hostel in hostels:
+            for booking in bookings_by_hostel[hostel.id]:
                 booking_response = BookingResponseSchema(
                     id=booking.id,
                     first_name=booking.first_name,
@@ -421,25 +610,62 @@ class HostelService:
                     status=booking.status,
                     created_at=booking.created_at,
                     updated_at=booking.updated_at,
+                    expires_at=booking.expires_at,
                 )
                 bookings_list.append(booking_response)
 
-                # Room price
-                room = self.room_repository.get_room_by_id(booking.room_id)
-                room_price = room.price_per_semester
-                room_prices.append(room_price)
+        # Totals come from the incrementally maintained stats, one row per hostel
+        stats_by_hostel = self.hostel_stats_repository.get_stats_for_hostels(hostel.id for hostel in hostels)
 
-
-        total_revenue = sum(room_prices)
-        total_number_of_rooms = sum(available_rooms)
+        hostel_stats = []
+        for hostel in hostels:
+            stats = stats_by_hostel.get(hostel.id)
+            if stats is None:
+                hostel_stats.append(HostelStatsResponse(hostel_id=hostel.id))
+                continue
+            hostel_stats.append(HostelStatsResponse(
+                hostel_id=stats.hostel_id,
+                pending_bookings=stats.pending_bookings,
+                confirmed_bookings=stats.confirmed_bookings,
+                cancelled_bookings=stats.cancelled_bookings,
+                booking_revenue=stats.booking_revenue,
+                amount_paid=stats.amount_paid,
+                room_count=stats.room_count,
+                capacity=stats.capacity,
+                occupancy=stats.occupancy,
+            ))
+
+        total_revenue = sum(stats.booking_revenue for stats in hostel_stats)
+        total_number_of_rooms = sum(hostel.available_rooms for hostel in hostels)
 
         return HostelDashboard(
             hostels=hostel_list,
             bookings=bookings_list,
+            stats=hostel_stats,
             total_revenue=str(total_revenue),
             total_rooms=str(total_number_of_rooms)
         )
 
 
+def refresh_revenue_rollup():
+    """
+    Brings daily_revenue up to date with the payments written or changed since the last run.
+
+    Runs in every worker, the checkpoint lock lets only one of them refresh at a time.
+    """
+    with SessionLocal() as session:
+        repository = RevenueRepository(session)
+        checkpoint = repository.lock_checkpoint(REVENUE_ROLLUP_CHECKPOINT)
+        if checkpoint is None:
+            return
+
+        processed_until = repository.get_database_time()
+        since = None
+        if checkpoint.processed_until is not None:
+            since = checkpoint.processed_until - REVENUE_ROLLUP_OVERLAP
 
+        buckets = repository.refresh_daily_revenue(since)
+        repository.advance_checkpoint(checkpoint, processed_until)
 
+    if buckets:
+        logger.info(f"Daily revenue buckets refreshed: {buckets}")
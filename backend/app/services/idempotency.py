@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+from backend.app.models.idempotency import IdempotencyKey
+from backend.app.repository.idempotency import IdempotencyRepository
+from backend.app.database.database import SessionLocal
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+SWEEP_BATCH_SIZE = 1000
+
+
+class IdempotencyService:
+    def __init__(self, idempotency_repository: IdempotencyRepository):
+        self.idempotency_repository = idempotency_repository
+
+    async def run(self, scope: str, key: Optional[str], payload: BaseModel,
+                  handler: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Handles a POST at most once per Idempotency-Key.
+
+        The first request with a key runs `handler` and stores its response; retries with
+        the same key and body replay that response without calling the handler again.
+        Requests without a key are handled as usual.
+        """
+        if key is None:
+            return await handler()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters long.")
+
+        request_hash = hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+        stored = self.idempotency_repository.claim_key(scope, key, request_hash, settings.IDEMPOTENCY_KEY_TTL,
+                                                       settings.IDEMPOTENCY_LEASE)
+        if stored is not None:
+            return self._replay(stored, request_hash)
+
+        completed = False
+        try:
+            response = await handler()
+            if not isinstance(response, Response):
+                response = JSONResponse(content=jsonable_encoder(response))
+            response_body = json.loads(response.body)
+            self.idempotency_repository.complete_key(scope, key, response.status_code, response_body)
+            completed = True
+        finally:
+            if not completed:
+                # Failed or cancelled, nothing was stored: let a retry handle the request again
+                self.idempotency_repository.release_key(scope, key)
+
+        return response
+
+    @staticmethod
+    def _replay(stored: IdempotencyKey, request_hash: str) -> Response:
+        if stored.request_hash != request_hash:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                                detail="Idempotency-Key was already used for a different request.")
+        if stored.status_code is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="A request with this Idempotency-Key is still being processed.")
+
+        return JSONResponse(content=stored.response_body, status_code=stored.status_code,
+                            headers={"Idempotent-Replayed": "true"})
+
+
+def sweep_expired_idempotency_keys():
+    """
+    Deletes every expired idempotency key, a batch at a time.
+    """
+    deleted = 0
+    with SessionLocal() as session:
+        repository = IdempotencyRepository(session)
+        while True:
+            batch = repository.delete_expired_keys(SWEEP_BATCH_SIZE)
+            deleted += batch
+            if batch < SWEEP_BATCH_SIZE:
+                break
+
+    if deleted:
+        logger.info(f"Expired idempotency keys deleted: {deleted}")
@@ -10,6 +10,7 @@ from backend.app.repository.transactions import TransactionRepository
 from backend.app.repository.hostels import HostelRepository
 from backend.app.repository.rooms import RoomsRepository
 from backend.app.repository.receipt import ReceiptRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
 from backend.app.schemas.receipts import ReceiptContext
 from backend.app.utils.receipt.receipt_generator import generate_receipt_background
 from backend.app.services.email_service import UserAuthEmailService
@@ -24,13 +25,15 @@ class MobilePaymentService:
         room_repository: RoomsRepository,
         hostel_repository: HostelRepository,
         transaction_repository: TransactionRepository,
-        receipt_repository: ReceiptRepository
+        receipt_repository: ReceiptRepository,
+        hostel_stats_repository: HostelStatsRepository
     ):
         self.payment_repository = payment_repository
         self.room_repository = room_repository
         self.hostel_repository = hostel_repository
         self.transaction_repository = transaction_repository
         self.receipt_repository = receipt_repository
+        self.hostel_stats_repository = hostel_stats_repository
 
     async def create_payment(self, data: PaymentCreate, background_tasks: BackgroundTasks):
         room = self.room_repository.get_room_by_id(data.room_id)
@@ -61,6 +64,8 @@ class MobilePaymentService:
         elif data.mobile_money_details:
             payment.mobile_money_details = MobileMoneyDetails(**data.mobile_money_details.model_dump())
 
+        # Committed together with the payment
+        self.hostel_stats_repository.record_payment(data.hostel_id, payment.amount)
         payment_id = self.payment_repository.make_payment(payment)
 
         # 🧾 Generate receipt
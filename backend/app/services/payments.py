@@ -1,11 +1,15 @@
 from fastapi import HTTPException, status, BackgroundTasks
 
+import logging
 import uuid
+from collections import defaultdict
+from typing import Dict
 
 from starlette.responses import JSONResponse
 
 from backend.app.repository.payments import PaymentRepository
 from backend.app.models.payments import Payment
+from backend.app.models.booking import BookingStatus
 from backend.app.responses.payments import *
 from backend.app.schemas.payments import *
 
@@ -14,6 +18,8 @@ from backend.app.repository.rooms import RoomsRepository
 from backend.app.repository.transactions import TransactionRepository
 from backend.app.repository.hostels import HostelRepository
 from backend.app.repository.receipt import ReceiptRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.reconciliation import ReconciliationRepository
 
 from backend.app.schemas.receipts import ReceiptContext
 
@@ -21,72 +27,89 @@ from backend.app.utils.receipt.receipt_generator import generate_receipt_backgro
 
 from backend.app.services.email_service import UserAuthEmailService
 
+from backend.app.database.database import SessionLocal
 from backend.app.core.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Checkpoint name of the payment reconciliation job, and ids it covers per transaction
+RECONCILIATION_CHECKPOINT = "payments"
+RECONCILIATION_BATCH_SIZE = 10000
 
 
 
 class PaymentService:
     def __init__(self, payment_repository: PaymentRepository, booking_repository: BookingRepository,
                  room_repository: RoomsRepository, transaction_repository: TransactionRepository,
-                 hostel_repository:HostelRepository, receipt_repository:ReceiptRepository ):
+                 hostel_repository:HostelRepository, receipt_repository:ReceiptRepository,
+                 hostel_stats_repository: HostelStatsRepository):
         self.payment_repository = payment_repository
         self.booking_repository = booking_repository
         self.room_repository = room_repository
         self.transaction_repository = transaction_repository
         self.hostel_repository = hostel_repository
         self.receipt_repository = receipt_repository
+        self.hostel_stats_repository = hostel_stats_repository
 
     async def create_payment(self, data: PaymentCreate, background_tasks: BackgroundTasks):
 
-        booking_info = self.booking_repository.get_booking_by_booking_id(data.booking_id)
+        # One unit of work: every read happens up front, every write is committed once at the end.
+        # The booking comes with its room and hostel and stays locked against the hold sweeper.
+        booking_info = self.booking_repository.get_booking_for_payment(data.booking_id)
         if not booking_info:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Booking with this id does not exist.")
+        if booking_info.status == BookingStatus.CANCELLED:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Booking was cancelled or its hold expired.")
 
-        room_info = self.room_repository.get_room_by_id(booking_info.room_id)
+        room_info = booking_info.room
         if not room_info:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room with this id does not exist.")
-        if room_info.booked_status:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Room is already booked")
+
+        hostel_info = booking_info.hostel
+        if not hostel_info:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hostel not found.")
 
         payments_info = self.payment_repository.get_payment_by_transaction_id(data.transaction_id)
 
         if payments_info:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Payment can not have the same transaction id.")
 
+        # check for transaction id in database and validate it(validating that the payment was received to our backend from strip)
+        transaction_id = self.transaction_repository.get_transaction_by_id(data.transaction_id)
+        if not transaction_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction id not found, payment not received.")
+
+        # Stripe received it, so the payment is recorded as completed straight away
         payment = Payment(
             booking_id=data.booking_id,
             amount=data.amount,
-            payment_status=data.payment_status.value,
+            payment_status=PaymentStatus.COMPLETED.value,
             transaction_id=data.transaction_id,
             payment_method=data.payment_method,
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
-        payment_id = self.payment_repository.make_payment(payment)
-
-        # check for transaction id in database and validate it(validating that the payment was received to our backend from strip)
-        transaction_id = self.transaction_repository.get_transaction_by_id(data.transaction_id)
-        if  transaction_id:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction id not found, payment not received.")
-
-        # update payment status to completed
-        payment_to_update = self.payment_repository.get_payment_by_id(payment_id)
 
-        payment_to_update.payment_status = PaymentStatus.COMPLETED.value
-
-        updated_payment_id = self.payment_repository.update_payment(payment_to_update)
-
-        updated_payment = self.payment_repository.get_payment_by_id(updated_payment_id)
-
-        # create receipt with payment info
-
-
-
-        hostel_info = self.hostel_repository.get_hostel_by_id(booking_info.hostel_id)
-        if not hostel_info:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hostel not found.")
+        # A paid booking is confirmed and no longer expires
+        previous_booking_status = booking_info.status
+        booking_info.status = BookingStatus.CONFIRMED
+        booking_info.expires_at = None
+        self.hostel_stats_repository.record_payment(booking_info.hostel_id, payment.amount,
+                                                    confirmed_from=previous_booking_status)
+
+        # Everything the receipt needs, read before the commit expires the loaded entities
+        hostel_name = hostel_info.name
+        room_number = room_info.room_number
+        room_price_per_semester = room_info.price_per_semester
+        booking_status = booking_info.status
+        student_name = f"{booking_info.first_name} {booking_info.last_name}"
+        student_email = booking_info.email_address
+        student_phone = booking_info.phone_number
+        student_university = booking_info.university
+
+        # Single commit: payment, booking confirmation and hostel stats
+        self.payment_repository.make_payment(payment)
 
         unique_id = str(uuid.uuid4())
 
@@ -96,26 +119,24 @@ class PaymentService:
             created_at=datetime.now(),
 
             # Booking Details
-            hostel_name=hostel_info.name,
-            room_number=room_info.room_number,
+            hostel_name=hostel_name,
+            room_number=room_number,
             duration=0,
-            status=booking_info.status,
+            status=booking_status.value,
 
             # Student information
-            student_name=booking_info.student_name,
-            student_email=booking_info.student_email,
-            student_phone=booking_info.student_phone,
-            student_course=booking_info.student_course,
-            student_study_year=booking_info.student_study_year,
-            student_university=booking_info.student_university,
+            student_name=student_name,
+            student_email=student_email,
+            student_phone=student_phone,
+            student_university=student_university,
 
             # Pricing
-            room_price_per_semester=room_info.price_per_semester,
+            room_price_per_semester=room_price_per_semester,
 
             # Payment information
-            payment_method=updated_payment.payment_method,
-            transaction_id=updated_payment.transaction_id,
-            security_deposit=updated_payment.amount
+            payment_method=data.payment_method,
+            transaction_id=data.transaction_id,
+            security_deposit=data.amount
         )
 
         bucket_name = settings.MINIO_PDF_BUCKET_NAME
@@ -127,3 +148,68 @@ class PaymentService:
         await UserAuthEmailService.send_receipt_email_with_link(receipt_context.student_email, background_tasks, bucket_name, f"{receipt_context.receipt_number}.pdf")
 
         return JSONResponse("Payment received successfully, check your email for the receipt")
+
+
+def _batch_end(after_id: int, until_id: int, batch_size: int) -> int:
+    return max(after_id, min(after_id + batch_size, until_id))
+
+
+def reconcile_payments(batch_size: int = RECONCILIATION_BATCH_SIZE) -> Dict[tuple, int]:
+    """
+    Reconciles payments against Stripe payments from the last checkpoint up to the rows
+    present when the run starts, committing the checkpoint with each batch.
+
+    The window passed by the previous runs is gone through once more first, if every
+    transaction that was running back then has ended, to pick up the rows those
+    transactions committed below the checkpoint.
+
+    Returns:
+        Dict[tuple, int]: The number of payments reconciled per (PaymentStatus, ReconciliationIssue).
+    """
+    totals = defaultdict(int)
+    with SessionLocal() as session:
+        payment_repository = PaymentRepository(session)
+        reconciliation_repository = ReconciliationRepository(session)
+        latest_payment_id, latest_stripe_payment_id = payment_repository.get_latest_ids()
+
+        checkpoint = reconciliation_repository.lock_checkpoint(RECONCILIATION_CHECKPOINT)
+        oldest_running_xid, _ = reconciliation_repository.get_snapshot_xids()
+        if checkpoint.last_snapshot_xmax is not None and oldest_running_xid >= checkpoint.last_snapshot_xmax:
+            settle_payment_id, settle_stripe_payment_id = checkpoint.last_payment_id, checkpoint.last_stripe_payment_id
+        else:
+            settle_payment_id, settle_stripe_payment_id = checkpoint.settled_payment_id, checkpoint.settled_stripe_payment_id
+        session.rollback()
+
+        while True:
+            checkpoint = reconciliation_repository.lock_checkpoint(RECONCILIATION_CHECKPOINT)
+            settled_payment_id = checkpoint.settled_payment_id
+            settled_stripe_payment_id = checkpoint.settled_stripe_payment_id
+            after_payment_id = checkpoint.last_payment_id
+            after_stripe_payment_id = checkpoint.last_stripe_payment_id
+
+            if settled_payment_id < settle_payment_id or settled_stripe_payment_id < settle_stripe_payment_id:
+                # Late rows only: payments never reconciled, found through the partial index in one go,
+                # and every Stripe payment of the window, in batches
+                upto_stripe_payment_id = _batch_end(settled_stripe_payment_id, settle_stripe_payment_id, batch_size)
+                counts = payment_repository.reconcile_payments(settled_payment_id, settle_payment_id,
+                                                               settled_stripe_payment_id, upto_stripe_payment_id,
+                                                               unreconciled_only=True)
+                reconciliation_repository.settle_checkpoint(checkpoint, settle_payment_id, upto_stripe_payment_id)
+            elif after_payment_id < latest_payment_id or after_stripe_payment_id < latest_stripe_payment_id:
+                upto_payment_id = _batch_end(after_payment_id, latest_payment_id, batch_size)
+                upto_stripe_payment_id = _batch_end(after_stripe_payment_id, latest_stripe_payment_id, batch_size)
+                counts = payment_repository.reconcile_payments(after_payment_id, upto_payment_id,
+                                                               after_stripe_payment_id, upto_stripe_payment_id)
+                _, snapshot_xmax = reconciliation_repository.get_snapshot_xids()
+                reconciliation_repository.advance_checkpoint(checkpoint, upto_payment_id, upto_stripe_payment_id,
+                                                             snapshot_xmax)
+            else:
+                session.rollback()
+                break
+
+            for key, count in counts.items():
+                totals[key] += count
+
+    if totals:
+        logger.info(f"Payments reconciled: {sum(totals.values())}")
+    return dict(totals)
@@ -1,4 +1,4 @@
-from fastapi import HTTPException, status, UploadFile
+from fastapi import HTTPException, status, UploadFile, Response
 from fastapi.responses import JSONResponse
 
 from backend.app.models.hostels import Room
@@ -7,25 +7,32 @@ from backend.app.schemas.rooms import *
 from backend.app.responses.rooms import *
 
 from backend.app.repository.hostels import HostelRepository
+from backend.app.repository.hostel_card import HostelCardRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
 
 from backend.app.models.images import ImageMetaData
 from backend.app.repository.images import ImageMetaDataRepository
 from backend.app.responses.images import Images
 from backend.app.utils.s3minio.minio_client import  generate_presigned_url, upload_image_file_to_minio
+from backend.app.utils.etag import make_etag, etag_matches
 
 from backend.app.models.users import User, UserRole
 from backend.app.core.config import get_settings
 from uuid import uuid4
+from typing import Optional
 
 settings = get_settings()
 
 
 class RoomService:
     def __init__(self, rooms_repository: RoomsRepository, hostel_repository: HostelRepository,
-                  image_repo: ImageMetaDataRepository):
+                  image_repo: ImageMetaDataRepository, hostel_card_repository: HostelCardRepository,
+                  hostel_stats_repository: HostelStatsRepository):
         self.rooms_repository = rooms_repository
         self.hostel_repository = hostel_repository
         self.image_repository = image_repo
+        self.hostel_card_repository = hostel_card_repository
+        self.hostel_stats_repository = hostel_stats_repository
 
 # working +
     async def create_room(self, images: List[UploadFile], data: RoomCreateSchema, current_user: User):
@@ -64,7 +71,9 @@ class RoomService:
             updated_at=datetime.now()
         )
 
-        # Save room to database
+        # Save room to database, together with the hostel stats
+        self.hostel_stats_repository.record_room(None, room.hostel_id, room.capacity, room.occupancy,
+                                                 room.price_per_semester)
         room =  self.rooms_repository.create_room(room)
 
 
@@ -96,6 +105,9 @@ class RoomService:
 
         image_count = len(uploaded)
 
+        # Room count and minimum price on the hostel card changed
+        self.hostel_card_repository.refresh_hostel_card(room.hostel_id)
+
         return JSONResponse(content= {"message": "Upload successful","files": image_count},
                             status_code=status.HTTP_200_OK)
 
@@ -127,6 +139,8 @@ class RoomService:
                                 detail="Room does not exist or does not belong to one of your hostels.")
 
         # Update room details (allow False/0 values)
+        previous_hostel_id = room.hostel_id
+        previous_capacity, previous_price = room.capacity, room.price_per_semester
         if data.hostel_id is not None:
             room.hostel_id = data.hostel_id
         if data.room_number is not None:
@@ -148,8 +162,13 @@ class RoomService:
 
         room.updated_at = datetime.now()
 
-        # Save updates
+        # Save updates, moving the room's share of the hostel stats in the same transaction
+        self.hostel_stats_repository.record_room(room.id, previous_hostel_id, previous_capacity, room.occupancy,
+                                                 previous_price, sign=-1)
+        self.hostel_stats_repository.record_room(room.id, room.hostel_id, room.capacity, room.occupancy,
+                                                 room.price_per_semester)
         self.rooms_repository.update_room(room)
+        self.hostel_card_repository.refresh_hostel_cards({previous_hostel_id, room.hostel_id})
 
         # Return updated room details
         return RoomResponse(
@@ -193,7 +212,11 @@ class RoomService:
                                 detail="Room does not exist or does not belong to one of your hostels.")
 
         # Delete room
+        hostel_id = room.hostel_id
+        self.hostel_stats_repository.record_room(room.id, hostel_id, room.capacity, room.occupancy,
+                                                 room.price_per_semester, sign=-1)
         self.rooms_repository.delete_room(room)
+        self.hostel_card_repository.refresh_hostel_card(hostel_id)
 
         return JSONResponse(content={"message": "Room deleted successfully"}, status_code=status.HTTP_200_OK)
 
@@ -231,7 +254,7 @@ class RoomService:
 
             # Get presigned_url for all the images
             for image in images:
-                url = generate_presigned_url(image.bucket_name, image.object_name)
+                url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
                 image_urls.append({"url": url})
 
             room_response = RoomResponse(
@@ -252,7 +275,17 @@ class RoomService:
         return AllRoomsResponse(rooms=room_list)
 
 # working +
-    async def get_all_rooms_by_hostel_id(self, hostel_id: int) -> AllRoomsResponse:
+    async def get_all_rooms_by_hostel_id(self, hostel_id: int, response: Optional[Response] = None,
+                                         if_none_match: Optional[str] = None):
+        # Conditional GET: answer from the rooms version alone when the client is up to date
+        version = self.rooms_repository.get_rooms_version(hostel_id)
+        etag = make_etag("all-rooms", hostel_id, version.room_count, version.last_updated_at,
+                         version.image_count, version.last_image_at)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        if response is not None:
+            response.headers["ETag"] = etag
+
         rooms =  self.rooms_repository.get_all_rooms_by_hostel_id(hostel_id)
 
         if not rooms:
@@ -270,7 +303,7 @@ class RoomService:
 
             # Get presigned_url for all the images
             for image in images:
-                url = generate_presigned_url(image.bucket_name, image.object_name)
+                url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
                 image_urls.append({"url": url})
 
             room_response = RoomResponse(
@@ -305,7 +338,7 @@ class RoomService:
 
         # Get presigned_url for all the images
         for image in images:
-            url = generate_presigned_url(image.bucket_name, image.object_name)
+            url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
             image_urls.append({"url": url})
 
         return RoomResponse(
@@ -331,7 +364,7 @@ class RoomService:
 
         # Get presigned_url for all the images
         for image in images:
-            url = generate_presigned_url(image.bucket_name, image.object_name)
+            url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
             image_urls.append({"url": url})
 
         return RoomResponse(
@@ -378,7 +411,7 @@ class RoomService:
 
         # Get presigned_url for all the images
         for image in images:
-            url = generate_presigned_url(image.bucket_name, image.object_name)
+            url = generate_presigned_url(image.bucket_name, image.object_name, version_id=image.version_id)
             image_urls.append({"url": url})
 
         # Return room details in the response
@@ -1,9 +1,29 @@
 from fastapi import HTTPException, status
 
+import json
+import logging
+from typing import List, Optional
+
 from backend.app.repository.transactions import TransactionRepository
 from backend.app.schemas.transactions import *
 from backend.app.responses.transactions import *
-from backend.app.models.payments import StripePayment
+from backend.app.models.payments import StripePayment, StripePaymentStatus
+from backend.app.database.database import SessionLocal
+from backend.app.utils.batching import BatchWriter
+from backend.app.utils.webhooks import verify_stripe_signature, WebhookSignatureError
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Webhook events stored as transactions, any other event is acknowledged and ignored
+STRIPE_EVENT_STATUSES = {
+    "payment_intent.succeeded": StripePaymentStatus.COMPLETED,
+}
+
+# Stripe amounts are in the smallest currency unit, except for these currencies
+ZERO_DECIMAL_CURRENCIES = {"bif", "clp", "djf", "gnf", "jpy", "kmf", "krw", "mga",
+                           "pyg", "rwf", "ugx", "vnd", "vuv", "xaf", "xof", "xpf"}
 
 
 class TransactionService:
@@ -27,12 +47,10 @@ class TransactionService:
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
-        transaction_id = self.transaction_repository.create_transaction(transaction)
+        # The repository refreshes the transaction, no need to read it back
+        self.transaction_repository.create_transaction(transaction)
 
         # Build a transaction response model
-
-        transaction = self.transaction_repository.get_transaction_by_id(transaction_id)
-
         transaction_response = TransactionResponse(
             id=transaction.id,
             payment_intent_id=transaction.payment_intent_id,
@@ -48,4 +66,82 @@ class TransactionService:
             updated_at=transaction.updated_at
         )
 
-        return transaction_response
\ No newline at end of file
+        return transaction_response
+
+
+def _stripe_event_to_transaction(event: dict) -> Optional[dict]:
+    """
+    Maps a Stripe payment intent event to StripePayment column values, or None if the event is not stored.
+    """
+    payment_status = STRIPE_EVENT_STATUSES.get(event.get("type"))
+    if payment_status is None:
+        return None
+
+    intent = event.get("data", {}).get("object", {})
+    currency = (intent.get("currency") or "").lower()
+    amount = intent.get("amount_received") or 0
+    if currency not in ZERO_DECIMAL_CURRENCIES:
+        amount = amount / 100
+
+    booking_id = (intent.get("metadata") or {}).get("booking_id")
+    payment_method = intent.get("payment_method") or next(iter(intent.get("payment_method_types") or []), "unknown")
+
+    now = datetime.now()
+    return {
+        "payment_intent_id": intent["id"],
+        "amount_received": amount,
+        "currency": currency,
+        "stripe_payment_status": payment_status,
+        "transaction_id": intent.get("latest_charge") or intent["id"],
+        "payment_method": payment_method,
+        "customer_id": intent.get("customer"),
+        "customer_email": intent.get("receipt_email"),
+        "booking_id": int(booking_id) if str(booking_id or "").isdigit() else None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def insert_stripe_transactions(transactions: List[dict]) -> int:
+    """
+    Writes one batch of webhook transactions with a session of its own.
+    """
+    with SessionLocal() as session:
+        inserted = TransactionRepository(session).insert_transactions(transactions)
+
+    if inserted < len(transactions):
+        logger.info(f"Stripe webhook batch: {inserted} inserted, {len(transactions) - inserted} already stored")
+    return inserted
+
+
+# Shared by every webhook request in this process
+stripe_transaction_writer = BatchWriter(insert_stripe_transactions,
+                                        max_batch=settings.STRIPE_WEBHOOK_BATCH_SIZE,
+                                        max_wait=settings.STRIPE_WEBHOOK_BATCH_WAIT)
+
+
+async def receive_stripe_webhook(payload: bytes, signature: Optional[str]) -> dict:
+    """
+    Verifies and stores one Stripe webhook delivery.
+
+    The event is written together with the other deliveries of the same short window,
+    and only acknowledged once stored, so Stripe retries anything that was lost.
+    """
+    if not settings.STRIPE_WEBHOOK_SECRET:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Stripe webhooks are not configured.")
+
+    try:
+        verify_stripe_signature(payload, signature, settings.STRIPE_WEBHOOK_SECRET, settings.STRIPE_WEBHOOK_TOLERANCE)
+    except WebhookSignatureError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        event = json.loads(payload)
+        transaction = _stripe_event_to_transaction(event)
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed event payload.")
+
+    if transaction is not None:
+        await stripe_transaction_writer.submit(transaction)
+
+    return {"received": True}
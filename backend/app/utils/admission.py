@@ -0,0 +1,81 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable
+
+
+class AdmissionQueueFull(Exception):
+    """
+    Raised when a key's queue is at its maximum depth or the wait timed out.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Admission queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _Lane:
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.depth = 0  # Requests holding or waiting for the lock
+
+
+class AdmissionQueue:
+    """
+    In-process, per-key admission queue with bounded depth.
+
+    Requests for the same key (e.g. a room) run one at a time, so a contended
+    key ties up a single database connection while the others wait in memory;
+    different keys never wait on each other. Once `max_depth` requests are
+    queued on a key, or a request has waited `max_wait` seconds, admission
+    fails fast with a suggested Retry-After based on the recent service time.
+    """
+
+    def __init__(self, max_depth: int = 32, max_wait: float = 5.0):
+        if max_depth < 1:
+            raise ValueError("max_depth must be at least 1")
+        self.max_depth = max_depth
+        self.max_wait = max_wait
+        self._lanes: Dict[Hashable, _Lane] = {}
+        # Exponentially weighted average time a request holds its lane, in seconds
+        self._service_time = 0.05
+        self.rejected = 0
+
+    def _retry_after(self, depth: int) -> int:
+        return max(1, math.ceil(depth * self._service_time))
+
+    def _reject(self, depth: int):
+        self.rejected += 1
+        raise AdmissionQueueFull(self._retry_after(depth))
+
+    @asynccontextmanager
+    async def admit(self, key: Hashable) -> AsyncIterator[None]:
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        if lane.depth >= self.max_depth:
+            self._reject(lane.depth)
+
+        lane.depth += 1
+        try:
+            try:
+                await asyncio.wait_for(lane.lock.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self._reject(lane.depth)
+
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                lane.lock.release()
+                self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - started)
+        finally:
+            lane.depth -= 1
+            if lane.depth == 0:
+                self._lanes.pop(key, None)
+
+    def __len__(self):
+        return len(self._lanes)
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """
+    Group commit for small writes that arrive in bursts.
+
+    Items submitted within `max_wait` seconds of each other, up to `max_batch`
+    of them, are handed to the blocking `write` callable as one list in a
+    worker thread. `submit` returns once the batch holding the item has been
+    written, and raises if writing it failed, so callers only acknowledge what
+    is stored.
+    """
+
+    def __init__(self, write: Callable[[List[Any]], Any], max_batch: int = 500, max_wait: float = 0.05):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.write = write
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        # Shielded, a client going away must not cancel the write for everyone else in the batch
+        await asyncio.shield(future)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            await asyncio.to_thread(self.write, [item for item, _ in batch])
+        except Exception as e:
+            logger.exception(f"Batch of {len(batch)} items could not be written")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def drain(self):
+        """
+        Writes whatever is still buffered and waits for every batch in flight.
+        """
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,29 @@
+import hashlib
+import time
+from typing import Optional
+
+from backend.app.core.config import get_settings
+
+settings = get_settings()
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from cheap version markers such as row counts and max(updated_at).
+
+    Responses embed presigned URLs, so the tag also rolls over every
+    PRESIGNED_URL_REFRESH_MARGIN seconds; clients then re-download a body
+    whose links are still valid instead of revalidating stale ones forever.
+    """
+    url_window = int(time.time() // settings.PRESIGNED_URL_REFRESH_MARGIN)
+    raw = "|".join(str(part) for part in (*parts, url_window))
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in if_none_match.split(","))
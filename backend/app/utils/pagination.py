@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+# Keyset position of a row: (created_at, id)
+CursorPosition = Tuple[datetime, int]
+# Keyset position of a search result: (rank, id)
+RankPosition = Tuple[float, int]
+
+
+def _encode(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8").rstrip("=")
+
+
+def _decode(cursor: str) -> Tuple[str, str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    key, row_id = base64.urlsafe_b64decode(padded.encode("utf-8")).decode("utf-8").rsplit("|", 1)
+    return key, row_id
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    return _encode(f"{created_at.isoformat()}|{row_id}")
+
+
+def decode_cursor(cursor: str) -> CursorPosition:
+    """Decode an opaque cursor back into its (created_at, id) position.
+
+    Raises:
+        ValueError: If the cursor was not produced by `encode_cursor`.
+    """
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def encode_rank_cursor(rank: float, row_id: int) -> str:
+    # repr() round-trips the float exactly, so the next page starts right after this row
+    return _encode(f"{rank!r}|{row_id}")
+
+
+def decode_rank_cursor(cursor: str) -> RankPosition:
+    """Decode an opaque search cursor back into its (rank, id) position.
+
+    Raises:
+        ValueError: If the cursor was not produced by `encode_rank_cursor`.
+    """
+    try:
+        rank, row_id = _decode(cursor)
+        return float(rank), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def build_page(rows: Sequence, limit: int, id_attr: str = "id") -> Tuple[List, Optional[str]]:
+    """Trim a `limit + 1` row fetch down to one page and work out the next cursor.
+
+    Rows must expose `created_at` and `id_attr` and be ordered by them.
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last.created_at, getattr(last, id_attr))
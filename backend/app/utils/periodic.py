@@ -0,0 +1,19 @@
+import asyncio
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval: float, job: Callable[[], Any]):
+    """
+    Runs a blocking job in a worker thread every `interval` seconds until cancelled.
+
+    A failing run is logged and the job is tried again on the next tick.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(job)
+        except Exception:
+            logger.exception(f"Periodic job {job.__name__} failed")
@@ -1,9 +1,9 @@
 from fastapi import BackgroundTasks
 from datetime import datetime
 
-import jinja2
-import pdfkit
+import logging
 import os
+import threading
 import uuid
 
 from backend.app.utils.s3minio.minio_client import upload_file_to_minio
@@ -11,38 +11,57 @@ from backend.app.utils.s3minio.minio_client import upload_file_to_minio
 from backend.app.repository.receipt import ReceiptRepository
 from backend.app.models.receipt import Receipt
 from backend.app.schemas.receipts import ReceiptStatus, ReceiptContext
+from backend.app.utils.receipt.renderers import ReceiptRenderPool
+from backend.app.core.config import get_settings
 
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
-def generate_receipt_pdf(context: ReceiptContext, bucket_name , receipt_repository: ReceiptRepository):
+_render_pool = None
+_render_pool_lock = threading.Lock()
 
-    # Generate unique file name
-    # unique_id = str(uuid.uuid4())
-    pdf_filename = f"{context.receipt_number}.pdf"
-    pdf_path = f"pdfs/{pdf_filename}"
-    content_type = "application/pdf"
 
-    # Define the absolute path to the templates folder
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    TEMPLATE_DIR = os.path.join(BASE_DIR, "../../templates")  # Adjust as needed
+def get_receipt_render_pool() -> ReceiptRenderPool:
+    """
+    Returns the process wide receipt render pool, started on first use.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ReceiptRenderPool(settings.RECEIPT_RENDERER,
+                                             workers=settings.RECEIPT_RENDER_WORKERS,
+                                             max_pending=settings.RECEIPT_RENDER_MAX_PENDING,
+                                             max_tasks_per_child=settings.RECEIPT_RENDER_MAX_TASKS_PER_CHILD)
+        return _render_pool
 
-    # Load the template from the correct directory
-    template_loader = jinja2.FileSystemLoader(TEMPLATE_DIR)
-    template_env = jinja2.Environment(loader=template_loader)
 
-    # Load the specific template file
-    template = template_env.get_template("receipt.html")
+def warm_up_receipt_render_pool():
+    try:
+        get_receipt_render_pool().warm_up()
+    except Exception:
+        logger.exception(f"Receipt renderer {settings.RECEIPT_RENDERER!r} could not be started")
+
 
-    # Render the template with the provided context
-    output_text = template.render(context)
+def shutdown_receipt_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown()
+            _render_pool = None
 
-    # Configure pdfkit with the path to wkhtmltopdf
-    config = pdfkit.configuration(wkhtmltopdf="/usr/bin/wkhtmltopdf")  # Ensure this path is correct
 
-    # Path to CSS file
-    CSS_PATH = os.path.join(BASE_DIR, "styles.css")  # Adjust path if necessary
+def generate_receipt_pdf(context: ReceiptContext, bucket_name , receipt_repository: ReceiptRepository):
+
+    # Generate unique file name
+    # unique_id = str(uuid.uuid4())
+    pdf_filename = f"{context.receipt_number}.pdf"
+    pdf_path = f"pdfs/{pdf_filename}"
+    content_type = "application/pdf"
 
-    # Generate the PDF from the rendered HTML template
-    pdfkit.from_string(output_text, pdf_path, configuration=config, css=CSS_PATH)
+    # Render in one of the warm pool workers instead of starting a renderer per receipt
+    pdf_bytes = get_receipt_render_pool().render(context.model_dump())
+    with open(pdf_path, "wb") as pdf_file:
+        pdf_file.write(pdf_bytes)
 
     # Step 1: Create receipt record (Initial Status: PENDING)
     receipt_metadata = Receipt(
@@ -0,0 +1,165 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Type
+
+import jinja2
+import pdfkit
+
+try:
+    from xhtml2pdf import pisa
+except ImportError:  # xhtml2pdf is optional, only the xhtml2pdf renderer needs it
+    pisa = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "../../templates")
+CSS_PATH = os.path.join(BASE_DIR, "styles.css")
+TEMPLATE_NAME = "receipt.html"
+
+
+class ReceiptRenderer:
+    """
+    Turns a receipt context into PDF bytes.
+
+    The template and stylesheet are loaded once per renderer, so a long lived
+    renderer only pays for rendering.
+    """
+    name = ""
+
+    def __init__(self):
+        template_env = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATE_DIR))
+        self.template = template_env.get_template(TEMPLATE_NAME)
+
+    def render(self, context: dict) -> bytes:
+        return self.html_to_pdf(self.template.render(context))
+
+    def html_to_pdf(self, html: str) -> bytes:
+        raise NotImplementedError
+
+
+class PdfkitRenderer(ReceiptRenderer):
+    """
+    Renders with wkhtmltopdf through pdfkit, one wkhtmltopdf process per receipt.
+    """
+    name = "pdfkit"
+
+    def __init__(self, wkhtmltopdf: str = "/usr/bin/wkhtmltopdf"):
+        super().__init__()
+        self.configuration = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf)
+
+    def html_to_pdf(self, html: str) -> bytes:
+        return pdfkit.from_string(html, False, configuration=self.configuration, css=CSS_PATH)
+
+
+class Xhtml2PdfRenderer(ReceiptRenderer):
+    """
+    Renders in-process with xhtml2pdf (pure Python, on top of ReportLab).
+    """
+    name = "xhtml2pdf"
+
+    def __init__(self):
+        if pisa is None:
+            raise RuntimeError("The xhtml2pdf receipt renderer needs the xhtml2pdf package installed")
+        super().__init__()
+        with open(CSS_PATH) as css_file:
+            self.stylesheet = f"<style>{css_file.read()}</style>"
+
+    def html_to_pdf(self, html: str) -> bytes:
+        # The stylesheet is inlined, xhtml2pdf does not fetch linked files
+        html = html.replace("</head>", f"{self.stylesheet}</head>", 1)
+        output = io.BytesIO()
+        result = pisa.CreatePDF(html, dest=output, encoding="utf-8")
+        if result.err:
+            raise RuntimeError(f"xhtml2pdf could not render the receipt ({result.err} errors)")
+        return output.getvalue()
+
+
+RENDERERS: Dict[str, Type[ReceiptRenderer]] = {
+    PdfkitRenderer.name: PdfkitRenderer,
+    Xhtml2PdfRenderer.name: Xhtml2PdfRenderer,
+}
+
+
+def get_receipt_renderer(name: str) -> ReceiptRenderer:
+    try:
+        return RENDERERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown receipt renderer {name!r}, expected one of {sorted(RENDERERS)}")
+
+
+# The renderer of the current pool worker process
+_worker_renderer: Optional[ReceiptRenderer] = None
+
+
+def _start_worker(renderer_name: str):
+    global _worker_renderer
+    _worker_renderer = get_receipt_renderer(renderer_name)
+
+
+def _render_in_worker(context: dict) -> bytes:
+    return _worker_renderer.render(context)
+
+
+def _ping() -> bool:
+    return _worker_renderer is not None
+
+
+class ReceiptRenderPool:
+    """
+    Bounded pool of warm renderer processes.
+
+    Each worker builds its renderer once at start up and renders receipts until
+    it has done `max_tasks_per_child` of them, then is replaced, which caps the
+    memory a worker can accumulate. At most `max_pending` receipts are queued or
+    rendering at once; callers beyond that block until a slot frees up.
+    """
+
+    def __init__(self, renderer_name: str, workers: int = 2, max_pending: int = 32,
+                 max_tasks_per_child: Optional[int] = 500):
+        if renderer_name not in RENDERERS:
+            raise ValueError(f"Unknown receipt renderer {renderer_name!r}, expected one of {sorted(RENDERERS)}")
+        self.renderer_name = renderer_name
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked, forking the threaded server process is not safe
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_start_worker,
+            initargs=(self.renderer_name,),
+            max_tasks_per_child=self.max_tasks_per_child,
+        )
+
+    def _replace_broken_executor(self, broken: ProcessPoolExecutor):
+        # A worker that died (crash, OOM kill) breaks the whole executor, start a new one
+        with self._executor_lock:
+            if self._executor is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+
+    def warm_up(self):
+        """
+        Starts every worker now instead of on the first receipts.
+        """
+        for future in [self._executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+    def render(self, context: dict) -> bytes:
+        with self._slots:
+            executor = self._executor
+            try:
+                return executor.submit(_render_in_worker, context).result()
+            except BrokenProcessPool:
+                self._replace_broken_executor(executor)
+                return self._executor.submit(_render_in_worker, context).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
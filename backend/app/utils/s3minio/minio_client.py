@@ -2,10 +2,12 @@ from minio import Minio
 import io
 
 from datetime import timedelta
+from typing import Optional
 
 from fastapi import HTTPException, UploadFile
 
 from backend.app.core.config import get_settings
+from backend.app.utils.s3minio.presigned_url_cache import PresignedUrlCache
 
 
 settings = get_settings()
@@ -15,11 +17,19 @@ internal_minio_client = Minio(settings.MINIO_ENDPOINT,
                settings.MINIO_ROOT_PASSWORD,
                secure=False)
 
+# Setting the region up front lets presigned URLs be signed locally,
+# otherwise the client looks the bucket location up over the network.
 external_minio_client = Minio(
     settings.MINIO_PUBLIC_ENDPOINT,  # e.g., "localhost:9000"
     access_key=settings.MINIO_ROOT_USER,
     secret_key=settings.MINIO_ROOT_PASSWORD,
-    secure=False
+    secure=False,
+    region=settings.MINIO_REGION
+)
+
+presigned_url_cache = PresignedUrlCache(
+    max_size=settings.PRESIGNED_URL_CACHE_SIZE,
+    refresh_margin=settings.PRESIGNED_URL_REFRESH_MARGIN
 )
 
 def ensure_bucket_exists(bucket_name: str):
@@ -65,11 +75,19 @@ async def upload_image_file_to_minio(bucket_name: str, object_name: str, file: U
     }
 
 
-def generate_presigned_url(bucket_name: str, object_name: str, expiry: int = 3600) -> str:
+def generate_presigned_url(bucket_name: str, object_name: str, expiry: int = 3600,
+                           version_id: Optional[str] = None) -> str:
+    """Sign a download URL in process, reusing a cached one while it is still fresh."""
+    cache_key = (bucket_name, object_name, version_id)
+    url = presigned_url_cache.get(cache_key)
+    if url:
+        return url
+
     try:
-        ensure_bucket_exists(bucket_name)  # Still use internal client to check
-        url = external_minio_client.presigned_get_object(bucket_name, object_name, expires=timedelta(seconds=expiry))
+        url = external_minio_client.presigned_get_object(bucket_name, object_name, expires=timedelta(seconds=expiry),
+                                                         version_id=version_id)
         #print(f"Presigned URL (external): {url}")
+        presigned_url_cache.set(cache_key, url, expiry)
         return url
     except Exception as e:
         print(f"Error generating presigned URL: {e}")
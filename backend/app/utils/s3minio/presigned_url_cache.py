@@ -0,0 +1,23 @@
+import time
+from typing import Callable, Hashable
+
+from backend.app.utils.cache import LRUCache
+
+
+class PresignedUrlCache(LRUCache):
+    """
+    Bounded, thread-safe LRU cache for presigned URLs.
+
+    Every entry lives as long as its URL is valid. A lookup only returns a URL
+    that still has at least `refresh_margin` seconds to live, so clients never
+    receive a link that is about to expire.
+    """
+
+    def __init__(self, max_size: int = 10_000, refresh_margin: int = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_size=max_size, ttl=0, clock=clock)
+        self.refresh_margin = refresh_margin
+
+    def set(self, key: Hashable, url: str, expiry: int):
+        # Dropped `refresh_margin` seconds before the URL expires, a fresh one is signed instead
+        super().set(key, url, ttl=expiry - self.refresh_margin)
@@ -0,0 +1,53 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+
+class WebhookSignatureError(Exception):
+    """
+    Raised when a webhook payload is not signed with the expected secret.
+    """
+
+
+def sign_stripe_payload(payload: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """
+    Builds a Stripe-Signature header value for a payload, as Stripe does when it delivers a webhook.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signed_payload = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed_payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def verify_stripe_signature(payload: bytes, header: Optional[str], secret: str, tolerance: int = 300):
+    """
+    Checks a Stripe-Signature header against the raw request body.
+
+    The header holds a timestamp and one or more v1 HMAC-SHA256 signatures of
+    "<timestamp>.<body>"; any of them may match. Timestamps older than
+    `tolerance` seconds are refused to limit replays.
+
+    Raises:
+        WebhookSignatureError: If the header is missing, malformed, stale or does not match.
+    """
+    if not header:
+        raise WebhookSignatureError("Missing signature header")
+
+    timestamp = None
+    signatures = []
+    for part in header.split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "t":
+            timestamp = value
+        elif name == "v1":
+            signatures.append(value)
+
+    if timestamp is None or not timestamp.isdigit() or not signatures:
+        raise WebhookSignatureError("Malformed signature header")
+    if tolerance and abs(time.time() - int(timestamp)) > tolerance:
+        raise WebhookSignatureError("Signature timestamp is outside the tolerance window")
+
+    expected = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    if not any(hmac.compare_digest(expected, signature) for signature in signatures):
+        raise WebhookSignatureError("Signature does not match the payload")
@@ -0,0 +1,115 @@
+"""
+Compares receipt PDF renderers: receipts per second and peak memory.
+
+Each mode runs in a fresh interpreter so peak RSS is not shared between them:
+  pdfkit     wkhtmltopdf spawned for every receipt (the previous receipt path)
+  xhtml2pdf  in-process xhtml2pdf, one receipt after the other
+  pool       ReceiptRenderPool of warm xhtml2pdf workers, receipts submitted concurrently
+
+Peak RSS is reported for the benchmark process and for its largest child
+(a wkhtmltopdf run or a pool worker).
+
+Usage:
+    python -m backend.benchmarks.receipts [--receipts 50] [--workers 2] [--modes pdfkit,xhtml2pdf,pool]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend.app.utils.receipt.renderers import ReceiptRenderPool, get_receipt_renderer
+
+MODES = ("pdfkit", "xhtml2pdf", "pool")
+
+
+def sample_context(number: int) -> dict:
+    # Same fields as ReceiptContext
+    return {
+        "receipt_number": f"UH-2026{number:06d}",
+        "created_at": datetime(2026, 10, 18, 12, 0),
+        "hostel_name": "Olympia Hostel",
+        "room_number": "B12",
+        "duration": 4,
+        "status": "confirmed",
+        "student_name": "Jane Student",
+        "student_email": "jane@student.example.com",
+        "student_phone": "+256700000000",
+        "student_university": "Makerere University",
+        "student_course": "Computer Science",
+        "student_study_year": "2",
+        "home_address": "Plot 1, Kampala Road",
+        "home_district": "Kampala",
+        "home_country": "Uganda",
+        "next_of_kin_name": "John Parent",
+        "next_of_kin_phone": "+256700000001",
+        "kin_relationship": "Father",
+        "room_price_per_semester": 1500000.0,
+        "payment_method": "card",
+        "transaction_id": f"ch_{number:024d}",
+        "security_deposit": 100000.0,
+    }
+
+
+def measure(mode: str, receipts: int, workers: int) -> dict:
+    contexts = [sample_context(i) for i in range(receipts)]
+    started = time.perf_counter()
+    total_bytes = 0
+
+    if mode == "pool":
+        pool = ReceiptRenderPool("xhtml2pdf", workers=workers, max_pending=workers * 4)
+        pool.warm_up()
+        # Warm up time is paid once per server, not per receipt
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 4) as submitters:
+            total_bytes = sum(len(pdf) for pdf in submitters.map(pool.render, contexts))
+        elapsed = time.perf_counter() - started
+        pool.shutdown()
+    else:
+        renderer = get_receipt_renderer(mode)
+        for context in contexts:
+            total_bytes += len(renderer.render(context))
+        elapsed = time.perf_counter() - started
+
+    # ru_maxrss is in kilobytes on Linux
+    return {
+        "mode": mode,
+        "receipts_per_second": receipts / elapsed,
+        "average_bytes": total_bytes / receipts,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_child_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def run(receipts: int, workers: int, modes):
+    print(f"{'mode':>10} {'receipts/s':>11} {'avg KB':>8} {'peak RSS MB':>12} {'peak child MB':>14}")
+    for mode in modes:
+        completed = subprocess.run(
+            [sys.executable, "-m", "backend.benchmarks.receipts", "--measure", mode,
+             "--receipts", str(receipts), "--workers", str(workers)],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            reason = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"
+            print(f"{mode:>10}  unavailable: {reason}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{mode:>10} {result['receipts_per_second']:>11.1f} {result['average_bytes'] / 1024:>8.1f} "
+              f"{result['peak_rss_mb']:>12.1f} {result['peak_child_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--receipts", type=int, default=50, help="Receipts rendered per mode (default: 50)")
+    parser.add_argument("--workers", type=int, default=2, help="Pool workers (default: 2)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma separated, from {', '.join(MODES)}")
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.receipts, args.workers)))
+    else:
+        run(args.receipts, args.workers, [mode for mode in args.modes.split(",") if mode])
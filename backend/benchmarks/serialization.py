@@ -0,0 +1,86 @@
+"""
+Compares JSON serialization cost and bytes on the wire for HostelListResponse.
+
+Mirrors what FastAPI does for a response model: dump the model in JSON mode,
+then render it with the response class, then (optionally) gzip the body the
+way GZipMiddleware does.
+
+Usage:
+    python -m backend.benchmarks.serialization [--repeat 20]
+"""
+import argparse
+import gzip
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from backend.app.responses.hostels import HostelListResponse, HostelResponse, Images
+
+SIZES = (10, 100, 1000)
+IMAGES_PER_HOSTEL = 4
+
+
+def _presigned_url(object_name: str) -> str:
+    # Same shape and length as a MinIO SigV4 presigned GET url
+    return (
+        f"https://minio.example.com/images/{object_name}"
+        "?X-Amz-Algorithm=AWS4-HMAC-SHA256"
+        "&X-Amz-Credential=minioadmin%2F20261018%2Fus-east-1%2Fs3%2Faws4_request"
+        "&X-Amz-Date=20261018T120000Z&X-Amz-Expires=3600&X-Amz-SignedHeaders=host"
+        f"&X-Amz-Signature={uuid4().hex}{uuid4().hex}"
+    )
+
+
+def build_response(count: int) -> HostelListResponse:
+    created_at = datetime(2026, 1, 1)
+    hostels = [
+        HostelResponse(
+            id=i,
+            name=f"Hostel {i}",
+            description="Quiet hostel close to campus with study rooms, a shared kitchen and laundry. " * 3,
+            location="Kumasi",
+            owner_id=1 + i % 25,
+            average_price=500000 + i * 100,
+            available_rooms=i % 12,
+            rules_and_regulations=["No smoking", "Quiet hours after 10pm", "No pets"],
+            amenities="wifi, water, security, laundry",
+            image_url=[Images(url=_presigned_url(f"hostels/{i}/{uuid4()}.jpg")) for _ in range(IMAGES_PER_HOSTEL)],
+            room_count=20,
+            min_room_price=450000.0,
+            created_at=created_at + timedelta(minutes=i),
+            updated_at=created_at + timedelta(minutes=i, seconds=30),
+        )
+        for i in range(1, count + 1)
+    ]
+    return HostelListResponse(hostels=hostels, next_cursor="MjAyNi0wMS0wMVQwMDowMDowMHwxMA")
+
+
+def _time(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run(repeat: int):
+    print(f"{'hostels':>8} {'encoder':>8} {'dump ms':>9} {'render ms':>10} {'gzip ms':>8} {'bytes':>9} {'gzip bytes':>11}")
+    for count in SIZES:
+        response = build_response(count)
+        for name, response_class in (("json", JSONResponse), ("orjson", ORJSONResponse)):
+            content = response.model_dump(mode="json")
+            body = response_class(content).body
+            compressed = gzip.compress(body, compresslevel=6)
+
+            dump_ms = _time(lambda: response.model_dump(mode="json"), repeat)
+            render_ms = _time(lambda: response_class(content), repeat)
+            gzip_ms = _time(lambda: gzip.compress(body, compresslevel=6), repeat)
+            print(f"{count:>8} {name:>8} {dump_ms:>9.2f} {render_ms:>10.2f} {gzip_ms:>8.2f} "
+                  f"{len(body):>9} {len(compressed):>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (default: 20)")
+    run(parser.parse_args().repeat)
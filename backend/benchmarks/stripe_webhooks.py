@@ -0,0 +1,123 @@
+"""
+Fires signed fake Stripe payment_intent.succeeded webhooks at a running server.
+
+A share of the events is redelivered, as Stripe does when an acknowledgement
+is slow or lost, so both the insert and the ON CONFLICT DO NOTHING paths are
+exercised. The server must run with the same STRIPE_WEBHOOK_SECRET.
+
+Usage:
+    python -m backend.benchmarks.stripe_webhooks --secret whsec_test [--url URL]
+        [--events 2000] [--concurrency 100] [--redeliver 0.2] [--booking-id 1]
+    python -m backend.benchmarks.stripe_webhooks --secret whsec_test --print
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from uuid import uuid4
+
+import httpx
+
+from backend.app.utils.webhooks import sign_stripe_payload
+
+DEFAULT_URL = "http://localhost:8000/transactions/stripe/webhook"
+
+
+def fake_event(booking_id=None) -> dict:
+    intent_id = f"pi_{uuid4().hex[:24]}"
+    created = int(time.time())
+    return {
+        "id": f"evt_{uuid4().hex[:24]}",
+        "object": "event",
+        "type": "payment_intent.succeeded",
+        "created": created,
+        "livemode": False,
+        "data": {
+            "object": {
+                "id": intent_id,
+                "object": "payment_intent",
+                "amount": 150000,
+                "amount_received": 150000,
+                "currency": "usd",
+                "status": "succeeded",
+                "latest_charge": f"ch_{uuid4().hex[:24]}",
+                "payment_method": f"pm_{uuid4().hex[:24]}",
+                "payment_method_types": ["card"],
+                "customer": f"cus_{uuid4().hex[:14]}",
+                "receipt_email": "student@example.com",
+                "metadata": {"booking_id": str(booking_id)} if booking_id is not None else {},
+                "created": created,
+            }
+        },
+    }
+
+
+def build_deliveries(events: int, redeliver: float, booking_id=None) -> list:
+    """
+    Returns `events` payloads, of which roughly `redeliver` are copies of earlier ones.
+    """
+    deliveries = []
+    for _ in range(events):
+        if deliveries and random.random() < redeliver:
+            deliveries.append(random.choice(deliveries))
+        else:
+            deliveries.append(json.dumps(fake_event(booking_id)).encode())
+    random.shuffle(deliveries)
+    return deliveries
+
+
+async def run(url: str, secret: str, events: int, concurrency: int, redeliver: float, booking_id=None):
+    deliveries = build_deliveries(events, redeliver, booking_id)
+    queue = asyncio.Queue()
+    for payload in deliveries:
+        queue.put_nowait(payload)
+
+    latencies = []
+    failures = 0
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal failures
+        while not queue.empty():
+            payload = queue.get_nowait()
+            # Signed when sent, so the timestamp is always within the tolerance window
+            headers = {"Content-Type": "application/json", "Stripe-Signature": sign_stripe_payload(payload, secret)}
+            started = time.perf_counter()
+            response = await client.post(url, content=payload, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                failures += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    unique = len(set(deliveries))
+    print(f"deliveries {len(deliveries)} ({unique} unique, {len(deliveries) - unique} redelivered), failures {failures}")
+    print(f"throughput {len(deliveries) / elapsed:.0f} events/s over {elapsed:.2f}s")
+    print(f"latency ms  p50 {statistics.median(latencies):.1f}  "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}  "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f}  max {latencies[-1]:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"Webhook endpoint (default: {DEFAULT_URL})")
+    parser.add_argument("--secret", required=True, help="The server's STRIPE_WEBHOOK_SECRET")
+    parser.add_argument("--events", type=int, default=2000, help="Deliveries to send (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=100, help="Deliveries in flight (default: 100)")
+    parser.add_argument("--redeliver", type=float, default=0.2, help="Share of redelivered events (default: 0.2)")
+    parser.add_argument("--booking-id", type=int, default=None, help="Booking id put in the event metadata")
+    parser.add_argument("--print", action="store_true", help="Print one signed event instead of sending any")
+    args = parser.parse_args()
+
+    if args.print:
+        payload = json.dumps(fake_event(args.booking_id), indent=2).encode()
+        print(f"Stripe-Signature: {sign_stripe_payload(payload, args.secret)}\n")
+        print(payload.decode())
+    else:
+        asyncio.run(run(args.url, args.secret, args.events, args.concurrency, args.redeliver, args.booking_id))
@@ -1,14 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from backend.app.core.config import get_settings
 from backend.app.routes.users import user_router, auth_router, guest_router, admin_router
 from backend.app.routes.hostels import hostel_router, hostel_user_router
 from backend.app.routes.rooms import room_router, room_user_router
 from backend.app.routes.booking import booking_user_router, booking_router
 from backend.app.routes.image_upload import image_router
+from backend.app.routes.transactions import transaction_router
+from backend.app.services.idempotency import sweep_expired_idempotency_keys
+from backend.app.services.booking import sweep_expired_booking_holds
+from backend.app.services.hostels import refresh_revenue_rollup
+from backend.app.services.transactions import stripe_transaction_writer
+from backend.app.utils.periodic import run_periodically
+from backend.app.utils.receipt.receipt_generator import warm_up_receipt_render_pool, shutdown_receipt_render_pool
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library encoder
+    orjson = None
+
+settings = get_settings()
+
+
+def get_default_response_class():
+    if settings.FAST_JSON_RESPONSES and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    # Background maintenance jobs, cancelled on shutdown
+    tasks = [
+        asyncio.create_task(run_periodically(settings.IDEMPOTENCY_SWEEP_INTERVAL, sweep_expired_idempotency_keys)),
+        asyncio.create_task(run_periodically(settings.BOOKING_HOLD_SWEEP_INTERVAL, sweep_expired_booking_holds)),
+        asyncio.create_task(run_periodically(settings.REVENUE_ROLLUP_INTERVAL, refresh_revenue_rollup)),
+    ]
+    # Start the receipt renderers in the background so the first receipts do not wait for them
+    tasks.append(asyncio.create_task(asyncio.to_thread(warm_up_receipt_render_pool)))
+    yield
+    for task in tasks:
+        task.cancel()
+    await stripe_transaction_writer.drain()
+    await asyncio.to_thread(shutdown_receipt_render_pool)
 
 
 def create_application():
-    application = FastAPI()
+    application = FastAPI(default_response_class=get_default_response_class(), lifespan=lifespan)
     # Users
     application.include_router(user_router)
     application.include_router(guest_router)
@@ -29,6 +72,16 @@ def create_application():
 
     application.include_router(image_router)
 
+    # Payment provider webhooks
+    application.include_router(transaction_router)
+
+    # Listing payloads repeat long presigned URLs and compress very well
+    application.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.GZIP_MINIMUM_SIZE,
+        compresslevel=settings.GZIP_COMPRESS_LEVEL,
+    )
+
     return application
 
 app = create_application()
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from backend.app.database.database import SessionLocal
+from backend.app.models.booking import Booking, BookingStatus
+from backend.app.models.hostel_stats import HostelStats
+from backend.app.models.hostels import Room
+from backend.app.repository.booking import BookingRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.hostels import HostelRepository
+from backend.app.repository.rooms import RoomsRepository
+from backend.app.schemas.booking import BookingCreateSchema, BookingStatus as BookingRequestStatus
+from backend.app.services.booking import BookingService
+
+
+def booking_service(session) -> BookingService:
+    return BookingService(BookingRepository(session), RoomsRepository(session), HostelRepository(session),
+                          HostelStatsRepository(session))
+
+
+def booking_request(room: Room, number: int = 1, hostel_id: int = None) -> BookingCreateSchema:
+    return BookingCreateSchema(first_name="Student", last_name=str(number), email_address=f"student{number}@example.com",
+                               phone_number="+256700000000", university="Makerere University",
+                               hostel_id=hostel_id or room.hostel_id, room_id=room.id,
+                               status=BookingRequestStatus.PENDING, created_at=datetime.now())
+
+
+@pytest.mark.parametrize("capacity, extra", [(1, 4), (4, 6)])
+def test_concurrent_bookings_never_overfill_a_room(session, make_room, capacity, extra):
+    room = make_room(capacity=capacity)
+    requests = [booking_request(room, number) for number in range(capacity + extra)]
+    start = threading.Barrier(len(requests))
+
+    def book(data: BookingCreateSchema) -> int:
+        # One session per request, as the API gives each request its own
+        with SessionLocal() as request_session:
+            service = booking_service(request_session)
+            start.wait()
+            try:
+                return asyncio.run(service.create_booking(data)).status_code
+            except HTTPException as e:
+                return e.status_code
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+        results = list(executor.map(book, requests))
+
+    assert sorted(results) == [200] * capacity + [403] * extra
+
+    session.expire_all()
+    room = session.get(Room, room.id)
+    assert room.occupancy == room.capacity
+    assert room.availability is True
+    assert session.query(Booking).filter(Booking.room_id == room.id).count() == capacity
+    stats = session.get(HostelStats, room.hostel_id)
+    assert (stats.pending_bookings, stats.occupancy) == (capacity, capacity)
+
+
+def test_closed_room_takes_no_bookings_and_stays_closed(session, make_room):
+    room = make_room(capacity=3, availability=False)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(booking_service(session).create_booking(booking_request(room)))
+
+    assert error.value.status_code == 403
+    session.expire_all()
+    room = session.get(Room, room.id)
+    assert (room.occupancy, room.availability) == (0, False)
+
+
+def test_booking_leaves_room_availability_to_the_owner(session, make_room):
+    room = make_room(capacity=2)
+    service = booking_service(session)
+
+    asyncio.run(service.create_booking(booking_request(room, 1)))
+    asyncio.run(service.create_booking(booking_request(room, 2)))
+    session.expire_all()
+    assert (session.get(Room, room.id).occupancy, session.get(Room, room.id).availability) == (2, True)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(service.create_booking(booking_request(room, 3)))
+    assert (error.value.status_code, error.value.detail) == (403, "Room is already full")
+
+
+def test_booking_rejects_a_room_of_another_hostel(session, make_room):
+    room = make_room(capacity=2)
+    other_room = make_room(capacity=2)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(booking_service(session).create_booking(booking_request(room, hostel_id=other_room.hostel_id)))
+
+    assert error.value.status_code == 400
+    session.expire_all()
+    assert session.get(Room, room.id).occupancy == 0
+    assert session.query(Booking).count() == 0
+
+
+def test_expired_hold_does_not_reopen_a_room_its_owner_closed(session, make_room):
+    room = make_room(capacity=1, occupancy=0)
+    asyncio.run(booking_service(session).create_booking(booking_request(room)))
+    # The owner closes the full room
+    session.expire_all()
+    room = session.get(Room, room.id)
+    room.availability = False
+    booking = session.query(Booking).filter(Booking.room_id == room.id).one()
+    booking.expires_at = datetime.now() - timedelta(minutes=1)
+    session.commit()
+
+    assert BookingRepository(session).release_expired_holds(datetime.now()) == 1
+
+    session.expire_all()
+    room = session.get(Room, room.id)
+    assert (room.occupancy, room.availability) == (0, False)
+    assert session.get(Booking, booking.id).status == BookingStatus.CANCELLED
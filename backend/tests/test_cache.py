@@ -0,0 +1,39 @@
+from backend.app.utils.cache import LRUCache
+from backend.app.utils.s3minio.presigned_url_cache import PresignedUrlCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_cache_expires_and_evicts():
+    clock = FakeClock()
+    cache = LRUCache(max_size=2, ttl=60, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+    assert cache.get("a") == 1  # "a" is now the most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    clock.now += 60
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 1, "max_size": 2, "hits": 3, "misses": 2, "evictions": 1}
+
+
+def test_presigned_url_cache_stops_serving_urls_close_to_expiry():
+    clock = FakeClock()
+    cache = PresignedUrlCache(max_size=10, refresh_margin=300, clock=clock)
+
+    cache.set(("images", "H1/front.jpg"), "https://minio/front.jpg?signature", expiry=3600)
+    clock.now += 3299
+    assert cache.get(("images", "H1/front.jpg")) == "https://minio/front.jpg?signature"
+
+    clock.now += 1
+    assert cache.get(("images", "H1/front.jpg")) is None
+    assert len(cache) == 0
@@ -0,0 +1,72 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+
+from backend.app.models.hostel_card import HostelCard
+from backend.app.models.hostels import Hostel
+from backend.app.models.users import User
+from backend.app.repository.booking import BookingRepository
+from backend.app.repository.hostel_card import HostelCardRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.hostels import HostelRepository
+from backend.app.repository.images import ImageMetaDataRepository
+from backend.app.repository.revenue import RevenueRepository
+from backend.app.repository.rooms import RoomsRepository
+from backend.app.schemas.hostels import HostelCreateSchema, HostelSearchSchema
+from backend.app.services import hostels as hostel_services
+from backend.app.services.hostels import HostelService
+from backend.main import app
+
+
+@pytest.fixture
+def hostel_service(session):
+    return HostelService(HostelRepository(session), ImageMetaDataRepository(session), BookingRepository(session),
+                         RoomsRepository(session), HostelCardRepository(session), HostelStatsRepository(session),
+                         RevenueRepository(session))
+
+
+def test_hostel_is_listed_when_its_image_upload_fails(session, hostel_service, make_room, monkeypatch):
+    owner = session.get(User, make_room().hostel.user_id)
+
+    async def upload_image_file_to_minio(bucket_name, object_name, file):
+        raise ConnectionError("MinIO is down")
+
+    monkeypatch.setattr(hostel_services, "upload_image_file_to_minio", upload_image_file_to_minio)
+    data = HostelCreateSchema(name="Lakeside Hostel", description="Quiet rooms by the lake", location="Entebbe",
+                              average_price=900000, rules_and_regulations="no smoking")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(hostel_service.create_hostel([UploadFile(BytesIO(b"image"), filename="front.jpg")], data, owner))
+
+    session.expire_all()
+    hostel = session.query(Hostel).filter(Hostel.name == "Lakeside Hostel").one()
+    card = session.get(HostelCard, hostel.id)
+    assert (card.name, card.location, card.images) == ("Lakeside Hostel", "Entebbe", [])
+
+
+def test_search_returns_hostels_without_a_card(session, hostel_service, make_room):
+    hostels = [make_room().hostel for _ in range(3)]
+    for hostel in hostels:
+        hostel.description = "Spacious rooms close to the university library"
+    session.commit()
+    # Only the first hostel got its card
+    HostelCardRepository(session).refresh_hostel_card(hostels[0].id)
+
+    results = HostelRepository(session).search_hostels("library", limit=10)
+    assert sorted(result["hostel_id"] for result in results) == sorted(hostel.id for hostel in hostels)
+    assert sum(result["card"] is None for result in results) == 2
+
+    response = asyncio.run(hostel_service.search_hostels(HostelSearchSchema(query="library", limit=2)))
+
+    assert len(response.hostels) == 2
+    assert response.next_cursor is not None
+    assert session.query(HostelCard).count() == 3
+
+
+@pytest.mark.parametrize("amenity", ["", "a" * 101])
+def test_filter_rejects_an_invalid_amenity(session, amenity):
+    response = TestClient(app).get("/hostels/filter", params={"amenities": amenity})
+    assert response.status_code == 422
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import update, func, text
+
+from backend.app.models.idempotency import IdempotencyKey
+from backend.app.repository.idempotency import IdempotencyRepository
+from backend.app.services.idempotency import IdempotencyService
+
+
+class Order(BaseModel):
+    room_id: int
+
+
+@pytest.fixture
+def repository(session):
+    return IdempotencyRepository(session)
+
+
+def test_request_in_progress_is_not_run_twice(repository):
+    assert repository.claim_key("booking.create", "key-1", "hash", ttl=86400, lease=60) is None
+
+    stored = repository.claim_key("booking.create", "key-1", "hash", ttl=86400, lease=60)
+    assert stored is not None and stored.status_code is None
+
+
+def test_claim_left_by_a_dead_worker_is_taken_over_after_the_lease(session, repository):
+    assert repository.claim_key("booking.create", "key-1", "hash", ttl=86400, lease=60) is None
+    # The worker died two minutes ago without completing the key
+    session.execute(update(IdempotencyKey).values(created_at=func.now() - text("interval '2 minutes'")))
+    session.commit()
+
+    assert repository.claim_key("booking.create", "key-1", "hash", ttl=86400, lease=60) is None
+
+    repository.complete_key("booking.create", "key-1", 200, {"ok": True})
+    session.execute(update(IdempotencyKey).values(created_at=func.now() - text("interval '2 minutes'")))
+    session.commit()
+    # A completed key is replayed, however old, until it expires
+    assert repository.claim_key("booking.create", "key-1", "hash", ttl=86400, lease=60).status_code == 200
+
+
+def test_cancelled_request_releases_its_key(session, repository):
+    service = IdempotencyService(repository)
+    calls = []
+
+    async def cancelled():
+        calls.append("cancelled")
+        raise asyncio.CancelledError()
+
+    async def handled():
+        calls.append("handled")
+        return {"ok": True}
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(service.run("booking.create", "key-1", Order(room_id=1), cancelled))
+    assert session.query(IdempotencyKey).count() == 0
+
+    response = asyncio.run(service.run("booking.create", "key-1", Order(room_id=1), handled))
+    assert response.status_code == 200
+    replayed = asyncio.run(service.run("booking.create", "key-1", Order(room_id=1), handled))
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    assert calls == ["cancelled", "handled"]
+
+
+def test_failed_request_releases_its_key(session, repository):
+    service = IdempotencyService(repository)
+
+    async def failing():
+        raise HTTPException(status_code=403, detail="Room is already full")
+
+    with pytest.raises(HTTPException):
+        asyncio.run(service.run("booking.create", "key-1", Order(room_id=1), failing))
+    assert session.query(IdempotencyKey).count() == 0
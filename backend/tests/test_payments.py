@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+from sqlalchemy import event
+
+from backend.app.models.booking import Booking, BookingStatus
+from backend.app.models.hostel_stats import HostelStats
+from backend.app.models.payments import (Payment, PaymentStatus as PaymentRecordStatus, StripePayment,
+                                         StripePaymentStatus)
+from backend.app.repository.booking import BookingRepository
+from backend.app.repository.hostel_stats import HostelStatsRepository
+from backend.app.repository.hostels import HostelRepository
+from backend.app.repository.payments import PaymentRepository
+from backend.app.repository.receipt import ReceiptRepository
+from backend.app.repository.rooms import RoomsRepository
+from backend.app.repository.transactions import TransactionRepository
+from backend.app.schemas.payments import PaymentCreate, PaymentStatus
+from backend.app.services.email_service import UserAuthEmailService
+from backend.app.services.payments import PaymentService
+
+
+@pytest.fixture
+def payment_service(session):
+    return PaymentService(PaymentRepository(session), BookingRepository(session), RoomsRepository(session),
+                          TransactionRepository(session), HostelRepository(session), ReceiptRepository(session),
+                          HostelStatsRepository(session))
+
+
+@pytest.fixture
+def pending_booking(session, make_booking):
+    booking = make_booking()
+    session.add(HostelStats(hostel_id=booking.hostel_id, pending_bookings=1))
+    # The charge as received by the Stripe webhook
+    session.add(StripePayment(payment_intent_id="pi_test_0001", amount_received=1500.0, currency="usd",
+                              stripe_payment_status=StripePaymentStatus.COMPLETED, transaction_id="ch_test_0001",
+                              payment_method="card", booking_id=booking.id))
+    session.commit()
+    return booking
+
+
+@pytest.fixture
+def sent_receipts(monkeypatch):
+    sent = []
+
+    async def send_receipt_email_with_link(user_email, background_tasks, bucket, file_name):
+        sent.append(user_email)
+
+    monkeypatch.setattr(UserAuthEmailService, "send_receipt_email_with_link", send_receipt_email_with_link)
+    return sent
+
+
+def test_create_payment_runs_as_one_transaction(session, engine, payment_service, pending_booking, sent_receipts):
+    booking_id, hostel_id = pending_booking.id, pending_booking.hostel_id
+    data = PaymentCreate(booking_id=booking_id, amount=1500.0, payment_status=PaymentStatus.PENDING,
+                         transaction_id="ch_test_0001", payment_method="card")
+
+    statements, commits = [], []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        asyncio.run(payment_service.create_payment(data, BackgroundTasks()))
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "commit", on_commit)
+
+    # Booking (locked), duplicate payment, stripe transaction, stats upsert,
+    # then the booking update and payment insert of the single flush
+    assert statements == ["SELECT", "SELECT", "SELECT", "INSERT", "UPDATE", "INSERT"]
+    assert len(commits) == 1
+    assert sent_receipts == [pending_booking.email_address]
+
+    session.expire_all()
+    payment = session.query(Payment).filter(Payment.booking_id == booking_id).one()
+    assert payment.payment_status == PaymentRecordStatus.COMPLETED
+    booking = session.get(Booking, booking_id)
+    assert booking.status == BookingStatus.CONFIRMED
+    assert booking.expires_at is None
+    stats = session.get(HostelStats, hostel_id)
+    assert (stats.pending_bookings, stats.confirmed_bookings, stats.amount_paid) == (0, 1, 1500.0)
+
+
+def test_create_payment_rejects_a_transaction_stripe_did_not_send(session, payment_service, pending_booking,
+                                                                  sent_receipts):
+    booking_id = pending_booking.id
+    data = PaymentCreate(booking_id=booking_id, amount=1500.0, payment_status=PaymentStatus.PENDING,
+                         transaction_id="ch_unknown", payment_method="card")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(payment_service.create_payment(data, BackgroundTasks()))
+
+    assert error.value.status_code == 404
+    session.rollback()
+    session.expire_all()
+    assert session.query(Payment).count() == 0
+    assert session.get(Booking, booking_id).status == BookingStatus.PENDING
+    assert sent_receipts == []
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import pytest
+
+from backend.app.database.database import SessionLocal
+from backend.app.models.payments import (Payment, PaymentStatus, ReconciliationIssue, StripePayment,
+                                         StripePaymentStatus)
+from backend.app.models.reconciliation import ReconciliationCheckpoint
+from backend.app.services.payments import reconcile_payments, RECONCILIATION_CHECKPOINT
+
+
+def payment(booking_id: int, transaction_id: str, amount: float = 1500.0) -> Payment:
+    return Payment(booking_id=booking_id, amount=amount, payment_status=PaymentStatus.PENDING,
+                   transaction_id=transaction_id, payment_method="card", created_at=datetime.now())
+
+
+def stripe_payment(booking_id: int, transaction_id: str, amount: float = 1500.0) -> StripePayment:
+    return StripePayment(payment_intent_id=f"pi_{transaction_id}", amount_received=amount, currency="usd",
+                         stripe_payment_status=StripePaymentStatus.COMPLETED, transaction_id=transaction_id,
+                         payment_method="card", booking_id=booking_id)
+
+
+@pytest.fixture
+def late_session(engine):
+    # A transaction that takes its ids first and commits after the others
+    with SessionLocal() as session:
+        yield session
+
+
+def checkpoint(session) -> ReconciliationCheckpoint:
+    session.expire_all()
+    return session.get(ReconciliationCheckpoint, RECONCILIATION_CHECKPOINT)
+
+
+def test_payment_committed_below_the_checkpoint_is_reconciled(session, late_session, make_booking):
+    booking_id = make_booking().id
+
+    late_session.add_all([payment(booking_id, "ch_late"), stripe_payment(booking_id, "ch_late")])
+    late_session.flush()
+    late_payment_id = late_session.query(Payment.id).scalar()
+
+    session.add_all([payment(booking_id, "ch_early"), stripe_payment(booking_id, "ch_early")])
+    session.commit()
+    assert session.query(Payment.id).filter(Payment.transaction_id == "ch_early").scalar() > late_payment_id
+
+    assert reconcile_payments() == {(PaymentStatus.COMPLETED, None): 1}
+    # The checkpoint is past the late payment, which is still being written
+    assert checkpoint(session).last_payment_id > late_payment_id
+    assert reconcile_payments() == {}
+    assert checkpoint(session).settled_payment_id == 0
+
+    late_session.commit()
+    reconcile_payments()
+
+    late_payment = session.get(Payment, late_payment_id)
+    assert late_payment.reconciled_at is not None
+    assert (late_payment.payment_status, late_payment.reconciliation_issue) == (PaymentStatus.COMPLETED, None)
+    assert checkpoint(session).settled_payment_id == checkpoint(session).last_payment_id
+    assert reconcile_payments() == {}
+
+
+def test_stripe_payment_committed_below_the_checkpoint_is_matched(session, late_session, make_booking):
+    booking_id = make_booking().id
+
+    late_session.add(stripe_payment(booking_id, "ch_late"))
+    late_session.flush()
+
+    session.add_all([payment(booking_id, "ch_late"), payment(booking_id, "ch_early"),
+                     stripe_payment(booking_id, "ch_early")])
+    session.commit()
+
+    assert reconcile_payments() == {(PaymentStatus.NOT_RECEIVED, ReconciliationIssue.MISSING_STRIPE_PAYMENT): 1,
+                                    (PaymentStatus.COMPLETED, None): 1}
+
+    late_session.commit()
+    reconcile_payments()
+
+    session.expire_all()
+    late_payment = session.query(Payment).filter(Payment.transaction_id == "ch_late").one()
+    assert (late_payment.payment_status, late_payment.reconciliation_issue) == (PaymentStatus.COMPLETED, None)
+    assert checkpoint(session).settled_stripe_payment_id == checkpoint(session).last_stripe_payment_id